@@ -0,0 +1,26 @@
+import secrets
+from typing import Annotated, Optional
+
+from fastapi import Header, HTTPException, status
+
+from core.config import settings
+
+
+def require_admin(authorization: Annotated[Optional[str], Header()] = None) -> None:
+    """
+    Доступ к служебным эндпоинтам по токену settings.admin.token.
+
+    Без настроенного токена эндпоинты отключены: ответ 404, как для
+    несуществующего маршрута.
+    """
+    token = settings.admin.token
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode("utf-8"), f"Bearer {token}".encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
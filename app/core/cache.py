@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import select
+
+from core.config import settings
+from crud.facet_counts_crud import GENERATION_COUNTER
+from database.database import db_helper
+from models.facet_model import CatalogCounter
+
+logger = logging.getLogger(__name__)
+
+# (поколение в БД, локальное поколение процесса)
+Generation = Tuple[int, int]
+
+
+class CatalogGeneration:
+    """
+    Поколение данных каталога.
+
+    Поколение в БД (строка generation таблицы catalog_counters) увеличивается
+    в транзакции каждой записи товаров и свойств, какой бы процесс ее ни
+    выполнил, и перечитывается в фоне раз в poll_interval секунд. Локальное
+    поколение увеличивается сразу после записи этим процессом и после
+    перестроения in-memory индексов. Ответы, закэшированные в предыдущих
+    поколениях, считаются устаревшими: записи других процессов становятся
+    видны не позже чем через poll_interval.
+    """
+
+    def __init__(self, poll_interval: float) -> None:
+        self.poll_interval = poll_interval
+        self.stored = 0
+        self.local = 0
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def value(self) -> Generation:
+        return self.stored, self.local
+
+    def bump(self) -> None:
+        """Переход к новому поколению после записи этим процессом."""
+        self.local += 1
+        if self._changed is not None:
+            # Поколение в БД перечитывается сразу, не дожидаясь интервала
+            self._changed.set()
+
+    async def load(self) -> None:
+        """Чтение поколения из БД (primary)."""
+        async with db_helper.session_factory() as session:
+            stored = await session.scalar(
+                select(CatalogCounter.value).where(
+                    CatalogCounter.name == GENERATION_COUNTER
+                )
+            )
+        self.stored = stored or 0
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error("Ошибка чтения поколения каталога: %s", e)
+
+    def start(self) -> None:
+        """Запуск фонового опроса поколения в БД."""
+        if self._task is None:
+            self._changed = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._changed = None
+
+
+class ResponseCache:
+    """
+    Ограниченный LRU-кэш готовых тел ответов.
+
+    Запись хранит поколение каталога и время создания; при несовпадении
+    поколения или истечении TTL запись удаляется при чтении.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[str, Tuple[Generation, float, bytes]] = OrderedDict()
+
+    def get(self, key: str, generation: Generation) -> Optional[bytes]:
+        """Получение тела ответа или None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry_generation, created_at, body = entry
+        if entry_generation != generation or time.monotonic() - created_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, generation: Generation, body: bytes) -> None:
+        """Сохранение тела ответа с вытеснением самых старых записей."""
+        self.entries[key] = (generation, time.monotonic(), body)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+def catalog_etag(cache_key: str, generation: int) -> str:
+    """
+    ETag страницы каталога: поколение каталога в БД и запрос.
+
+    Поколение общее для всех процессов, поэтому ETag одной страницы
+    совпадает, какой бы воркер ее ни отдал.
+    """
+    digest = hashlib.sha1(cache_key.encode("utf-8")).hexdigest()[:16]
+    return f'"{generation}-{digest}"'
+
+
+def product_etag(updated_at: datetime) -> str:
+    """ETag товара по времени его последней записи."""
+    return f'"{int(updated_at.timestamp() * 1_000_000):x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадает ли ETag с одним из значений заголовка If-None-Match."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def canonical_query(query_string: str) -> str:
+    """Каноническая форма строки запроса: параметры и значения отсортированы."""
+    return urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+
+
+catalog_generation = CatalogGeneration(settings.cache.generation_poll_interval)
+catalog_cache = ResponseCache(
+    settings.cache.catalog_max_entries, settings.cache.catalog_ttl
+)
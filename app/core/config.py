@@ -1,9 +1,11 @@
 import logging
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic import BaseModel, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from core.log import LoggingPipeline
+
 LOG_DEFAULT_FORMAT = (
     "[%(asctime)s.%(msecs)03d] %(module)10s:%(lineno)-3d %(levelname)-7s - %(message)s"
 )
@@ -29,6 +31,10 @@ class LoggingConfig(BaseModel):
     Attributes:
         log_level (Literal): Уровень логирования (debug, info, warning, error, critical)
         log_format (str): Формат логов
+        log_json (bool): Вывод записей в JSON (одна запись на строку) вместо log_format
+        queue_size (int): Размер очереди записей; при переполнении записи отбрасываются
+        sampling (dict): Доля сохраняемых записей ниже WARNING по логгерам,
+            например {"crud": 0.01}
     """
 
     log_level: Literal[
@@ -39,6 +45,9 @@ class LoggingConfig(BaseModel):
         "critical",
     ] = "info"
     log_format: str = LOG_DEFAULT_FORMAT
+    log_json: bool = False
+    queue_size: int = 10000
+    sampling: dict[str, float] = {}
 
     @property
     def log_level_value(self) -> int:
@@ -56,6 +65,15 @@ class DatabaseConfig(BaseModel):
         echo_pool (bool): Логирование пула соединений
         pool_size (int): Размер пула соединений
         max_overflow (int): Максимальное переполнение пула
+        replica_urls (list): URL реплик для запросов только на чтение
+            (JSON-список в переменной окружения)
+        replica_health_interval (float): Интервал проверки реплик в секундах
+        replica_health_timeout (float): Таймаут проверки реплики в секундах
+        read_your_writes_window (float): Сколько секунд после записи чтения
+            клиента направляются в primary
+        query_cache_size (int): Размер кэша скомпилированных запросов SQLAlchemy
+        prepared_statement_cache_size (int): Размер кэша подготовленных
+            запросов asyncpg на соединение
         naming_convention (dict): Конвенции именования для SQLAlchemy
     """
 
@@ -64,6 +82,12 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    replica_urls: list[PostgresDsn] = []
+    replica_health_interval: float = 5.0
+    replica_health_timeout: float = 2.0
+    read_your_writes_window: float = 5.0
+    query_cache_size: int = 500
+    prepared_statement_cache_size: int = 256
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -74,6 +98,148 @@ class DatabaseConfig(BaseModel):
     }
 
 
+class IndexConfig(BaseModel):
+    """
+    Конфигурация in-memory индексов каталога.
+
+    Attributes:
+        facet_index (bool): Строить битовые карты list-свойств при старте приложения
+        int_columns (bool): Держать значения int-свойств в массивах NumPy
+        rebuild_interval (float): Интервал перестроения in-memory индексов из БД
+            в секундах (0 - только при старте, допустимо лишь с одним воркером)
+    """
+
+    facet_index: bool = False
+    int_columns: bool = False
+    rebuild_interval: float = 60.0
+
+
+class SearchConfig(BaseModel):
+    """
+    Конфигурация поиска товаров по имени.
+
+    Attributes:
+        name_backend (Literal): Бэкенд поиска (ilike, trigram, fulltext, ngram)
+        ngram_size (int): Длина n-грамм in-process индекса (бэкенд ngram)
+    """
+
+    name_backend: Literal[
+        "ilike",
+        "trigram",
+        "fulltext",
+        "ngram",
+    ] = "ilike"
+    ngram_size: int = 3
+
+
+class CacheConfig(BaseModel):
+    """
+    Конфигурация кэша ответов каталога.
+
+    Attributes:
+        catalog_enabled (bool): Кэшировать ответы GET /catalog/
+        catalog_max_entries (int): Максимальное количество ответов в кэше (LRU)
+        catalog_ttl (float): Максимальный возраст ответа в секундах
+        generation_poll_interval (float): Интервал опроса поколения каталога в БД
+            в секундах; ограничивает устаревание, если запись выполнена другим
+            процессом
+    """
+
+    catalog_enabled: bool = True
+    catalog_max_entries: int = 1024
+    catalog_ttl: float = 60.0
+    generation_poll_interval: float = 1.0
+
+
+class CatalogConfig(BaseModel):
+    """
+    Конфигурация чтения каталога (GET /catalog/, GET /products).
+
+    Attributes:
+        projection (Literal): Способ построения страницы: orm (ORM-объекты и
+            jsonable_encoder) или json (JSON товаров собирается в БД одним запросом)
+        multi_get_limit (int): Максимальное количество UUID в GET /products
+        filter_shape (Literal): Форма условий фильтра: exists (EXISTS на каждое
+            свойство) или unnest (все фильтры параметрами-массивами, форма
+            запроса не зависит от числа фильтров)
+        filter_spec_cache_size (int): Размер LRU-кэша разобранных фильтров
+            (FilterSpec) по строке запроса
+    """
+
+    projection: Literal["orm", "json"] = "orm"
+    filter_shape: Literal["exists", "unnest"] = "exists"
+    multi_get_limit: int = 200
+    filter_spec_cache_size: int = 1024
+
+
+class ExportConfig(BaseModel):
+    """
+    Конфигурация выгрузки каталога.
+
+    Attributes:
+        batch_size (int): Количество товаров, читаемых из серверного курсора за раз
+    """
+
+    batch_size: int = 1000
+
+
+class BulkConfig(BaseModel):
+    """
+    Конфигурация массовой загрузки товаров.
+
+    Attributes:
+        chunk_size (int): Количество товаров, проверяемых и вставляемых одной транзакцией
+    """
+
+    chunk_size: int = 1000
+
+
+class MetricsConfig(BaseModel):
+    """
+    Конфигурация метрик (GET /metrics).
+
+    Attributes:
+        enabled (bool): Собирать метрики HTTP-запросов, запросов к БД и пулов
+    """
+
+    enabled: bool = True
+
+
+class AdminConfig(BaseModel):
+    """
+    Конфигурация служебных эндпоинтов (GET /metrics, /diagnostics/*).
+
+    Attributes:
+        token (Optional[str]): Токен доступа (заголовок Authorization: Bearer);
+            без токена служебные эндпоинты отключены и отвечают 404
+    """
+
+    token: Optional[str] = None
+
+
+class SlowQueryConfig(BaseModel):
+    """
+    Конфигурация журнала медленных запросов (GET /diagnostics/slow-queries).
+
+    Attributes:
+        enabled (bool): Записывать медленные запросы
+        threshold (float): Порог длительности запроса в секундах
+        explain_sample_rate (float): Доля медленных SELECT, для которых в фоне
+            выполняется EXPLAIN (ANALYZE, BUFFERS)
+        max_entries (int): Размер кольцевого буфера медленных запросов
+        max_plans (int): Размер кольцевого буфера планов
+        log_parameters (bool): Сохранять значения параметров запросов (могут
+            содержать данные клиентов); по умолчанию они скрываются
+    """
+
+    enabled: bool = True
+    threshold: float = 0.5
+    explain_sample_rate: float = 0.1
+    max_entries: int = 200
+    max_plans: int = 20
+    log_parameters: bool = False
+
+
 class Settings(BaseSettings):
     """
     Основные настройки приложения.
@@ -90,24 +256,45 @@ class Settings(BaseSettings):
     run: RunConfig = RunConfig()
     logging: LoggingConfig = LoggingConfig()
     db: DatabaseConfig
+    index: IndexConfig = IndexConfig()
+    search: SearchConfig = SearchConfig()
+    cache: CacheConfig = CacheConfig()
+    catalog: CatalogConfig = CatalogConfig()
+    export: ExportConfig = ExportConfig()
+    bulk: BulkConfig = BulkConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    admin: AdminConfig = AdminConfig()
+    slow_query: SlowQueryConfig = SlowQueryConfig()
 
 
-def configure_logging(log_config: LoggingConfig):
+def configure_logging(log_config: LoggingConfig) -> LoggingPipeline:
     """
     Настраивает глобальное логирование для приложения.
 
+    Записи передаются через очередь в отдельный поток (QueueListener), поэтому
+    форматирование и вывод не выполняются в цикле событий.
+
     Args:
         log_config (LoggingConfig): Конфигурация логирования
+
+    Returns:
+        Запущенный конвейер логирования
     """
-    logging.basicConfig(
+    logging.getLogger().setLevel(log_config.log_level_value)
+    pipeline = LoggingPipeline(
         level=log_config.log_level_value,
-        format=log_config.log_format,
+        log_format=log_config.log_format,
+        json_output=log_config.log_json,
+        queue_size=log_config.queue_size,
+        sampling=log_config.sampling,
     )
+    pipeline.start()
     logging.getLogger("sqlalchemy.engine.Engine").disabled = True
     logger = logging.getLogger(__name__)
     logger.info("Логирование успешно настроено")
+    return pipeline
 
 
 # Инициализация настроек и логирования
 settings = Settings()
-configure_logging(settings.logging)
+log_pipeline = configure_logging(settings.logging)
@@ -0,0 +1,149 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Mapping, Optional
+
+from core.request_context import current_route
+
+# Стандартные атрибуты LogRecord; остальные (extra=...) попадают в JSON
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "route"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route is not None:
+            entry["route"] = route
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Выборочная запись сообщений по логгерам.
+
+    rates задает долю сохраняемых записей для логгера и его потомков
+    (например, {"crud": 0.01}); для логгера действует самый длинный
+    подходящий префикс. Записи уровня WARNING и выше сохраняются всегда.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: Dict[str, float] = {}
+
+    def rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Обработчик, передающий записи в очередь без форматирования.
+
+    Сообщение форматируется в потоке QueueListener (ленивое %-форматирование
+    по record.args), в вызывающем потоке только копируется запись и
+    запоминается маршрут HTTP-запроса. При переполнении очереди запись
+    отбрасывается, а не блокирует цикл событий.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.route = current_route()
+        if record.exc_info:
+            # traceback держит кадры стека: текст получаем сразу
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    """Очередь логов и поток QueueListener, пишущий записи в stderr."""
+
+    def __init__(
+        self,
+        level: int,
+        log_format: str,
+        json_output: bool = False,
+        queue_size: int = 10000,
+        sampling: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+        output = logging.StreamHandler(sys.stderr)
+        if json_output:
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter(log_format))
+
+        self.handler = NonBlockingQueueHandler(log_queue)
+        self.handler.setLevel(level)
+        if sampling:
+            self.handler.addFilter(SamplingFilter(sampling))
+        self.listener = QueueListener(log_queue, output, respect_handler_level=True)
+        self.started = False
+
+    def start(self) -> None:
+        """Замена обработчиков корневого логгера очередью и запуск потока записи."""
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        self.listener.start()
+        self.started = True
+        # Оставшиеся в очереди записи выводятся при завершении процесса
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        if self.started:
+            self.started = False
+            self.listener.stop()
+        logging.getLogger().removeHandler(self.handler)
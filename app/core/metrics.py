@@ -0,0 +1,327 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Границы корзин гистограмм длительности, сек
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Границы корзин числа запросов к БД на HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Базовый класс метрики с набором значений по меткам."""
+
+    type_name = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, value in self.values.items():
+            lines.append(
+                f"{self.name}{format_labels(self.labelnames, labels)} "
+                f"{format_value(value)}"
+            )
+        return lines
+
+
+class Gauge(Metric):
+    """Метрика, значения которой вычисляются функцией в момент сбора."""
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, value in self.callback():
+            lines.append(
+                f"{self.name}{format_labels(self.labelnames, labels)} "
+                f"{format_value(value)}"
+            )
+        return lines
+
+
+class Histogram(Metric):
+    """
+    Гистограмма с фиксированными корзинами.
+
+    observe только увеличивает счетчик корзины; накопленные значения
+    bucket{le=...} считаются при сборе.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # метки -> [счетчики корзин (+ корзина +Inf), сумма]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        bounds = [*self.buckets, float("inf")]
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = format_labels(
+                    (*self.labelnames, "le"), (*labels, format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels_text = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{labels_text} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Текстовый формат Prometheus (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """Запросы к БД, выполненные в рамках одного HTTP-запроса."""
+
+    __slots__ = ("queries", "query_time")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.query_time = 0.0
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+registry = Registry()
+
+http_requests_total = registry.register(
+    Counter(
+        "http_requests_total",
+        "Количество HTTP-запросов",
+        ("method", "route", "status"),
+    )
+)
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Длительность HTTP-запроса",
+        ("method", "route"),
+    )
+)
+http_request_db_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Количество запросов к БД на HTTP-запрос",
+        ("method", "route"),
+        QUERY_COUNT_BUCKETS,
+    )
+)
+http_request_db_duration = registry.register(
+    Histogram(
+        "http_request_db_duration_seconds",
+        "Суммарное время запросов к БД на HTTP-запрос",
+        ("method", "route"),
+    )
+)
+db_query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Длительность запроса к БД",
+        ("pool",),
+    )
+)
+db_pool_checkout_wait = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Время получения соединения из пула",
+        ("pool",),
+    )
+)
+
+# Пулы по имени: движок и предельное число соединений (pool_size +
+# max_overflow). Состояние пулов читается только при сборе метрик
+pools: Dict[str, Tuple[AsyncEngine, int]] = {}
+
+
+def pool_gauge(read: Callable) -> Callable[[], List[Tuple[Tuple[str], float]]]:
+    return lambda: [
+        ((name,), read(engine.pool, capacity))
+        for name, (engine, capacity) in pools.items()
+    ]
+
+
+def pool_saturation(pool, capacity: int) -> float:
+    return pool.checkedout() / capacity if capacity else 0.0
+
+
+registry.register(
+    Gauge(
+        "db_pool_size",
+        "Постоянный размер пула соединений",
+        ("pool",),
+        pool_gauge(lambda pool, capacity: pool.size()),
+    )
+)
+registry.register(
+    Gauge(
+        "db_pool_checked_out",
+        "Количество выданных соединений",
+        ("pool",),
+        pool_gauge(lambda pool, capacity: pool.checkedout()),
+    )
+)
+registry.register(
+    Gauge(
+        "db_pool_overflow",
+        "Количество соединений сверх постоянного размера пула",
+        ("pool",),
+        pool_gauge(lambda pool, capacity: max(pool.overflow(), 0)),
+    )
+)
+registry.register(
+    Gauge(
+        "db_pool_saturation",
+        "Доля занятых соединений от pool_size + max_overflow",
+        ("pool",),
+        pool_gauge(pool_saturation),
+    )
+)
+
+
+def instrumented_pool_class(name: str) -> Type[AsyncAdaptedQueuePool]:
+    """
+    Класс пула, измеряющий время получения соединения.
+
+    Имя пула хранится в классе, а не в экземпляре: engine.dispose()
+    пересоздает пул тем же классом.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return AsyncAdaptedQueuePool._do_get(self)
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, name)
+
+    return type(
+        "InstrumentedAsyncAdaptedQueuePool",
+        (AsyncAdaptedQueuePool,),
+        {"_do_get": _do_get},
+    )
+
+
+def instrument_engine(engine: AsyncEngine, name: str, capacity: int) -> None:
+    """
+    Учет запросов движка и состояния его пула.
+
+    Args:
+        engine: Движок.
+        name: Имя пула в метках метрик.
+        capacity: Предельное число соединений пула (pool_size + max_overflow).
+    """
+    if isinstance(engine.pool, AsyncAdaptedQueuePool):
+        pools[name] = (engine, capacity)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_duration.observe(elapsed, name)
+        request = current_request.get()
+        if request is not None:
+            request.queries += 1
+            request.query_time += elapsed
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        # after_cursor_execute не вызывается для упавшего запроса
+        if context.connection is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                started.pop()
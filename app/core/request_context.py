@@ -0,0 +1,39 @@
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# ASGI scope текущего HTTP-запроса; роутер дописывает в него "route"
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """
+    Шаблон пути текущего запроса (например, /product/{product_uid}).
+
+    Returns:
+        Шаблон пути, сам путь, если маршрут еще не выбран, или None вне
+        HTTP-запроса.
+    """
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return route.path if route is not None else scope.get("path")
+
+
+class RequestContextMiddleware:
+    """ASGI middleware, сохраняющее scope запроса в current_scope."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
@@ -0,0 +1,401 @@
+import logging
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    Select,
+    any_,
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    literal_column,
+    null,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.facet_model import CatalogCounter, FacetCount, FacetIntBounds
+from models.product_model import Product, ProductPropertyInt, ProductPropertyValue
+
+# Настройка логгера
+logger = logging.getLogger(__name__)
+
+PRODUCTS_COUNTER = "products"
+# Поколение каталога: увеличивается каждой записью товаров и свойств
+GENERATION_COUNTER = "generation"
+
+
+class IntValuesRemoved(NamedTuple):
+    """Количество и границы удаленных значений int-свойства."""
+
+    count: int
+    min_value: int
+    max_value: int
+
+    def merge(self, other: "IntValuesRemoved") -> "IntValuesRemoved":
+        return IntValuesRemoved(
+            self.count + other.count,
+            min(self.min_value, other.min_value),
+            max(self.max_value, other.max_value),
+        )
+
+
+def merge_int_values_removed(
+    target: Dict[UUID, IntValuesRemoved], removed: Mapping[UUID, IntValuesRemoved]
+) -> None:
+    """Добавление агрегатов пачки удаления к агрегатам всего запроса."""
+    for property_uid, values in removed.items():
+        current = target.get(property_uid)
+        target[property_uid] = values if current is None else current.merge(values)
+
+
+def build_facet_counts_query() -> Select:
+    """
+    Статистика фасетов без фильтров из материализованных таблиц.
+
+    Возвращает строки той же формы, что и build_facet_statistics_query:
+    (kind, property_uid, value_uid, count, min, max).
+    """
+    total_stats = select(
+        literal_column("'total'").label("kind"),
+        cast(null(), FacetCount.property_uid.type).label("property_uid"),
+        cast(null(), FacetCount.value_uid.type).label("value_uid"),
+        CatalogCounter.value.label("count"),
+        cast(null(), Integer).label("min_value"),
+        cast(null(), Integer).label("max_value"),
+    ).where(CatalogCounter.name == PRODUCTS_COUNTER)
+
+    list_stats = select(
+        literal_column("'list'"),
+        FacetCount.property_uid,
+        FacetCount.value_uid,
+        FacetCount.count,
+        cast(null(), Integer),
+        cast(null(), Integer),
+    ).where(FacetCount.count > 0)
+
+    int_stats = select(
+        literal_column("'int'"),
+        FacetIntBounds.property_uid,
+        cast(null(), FacetCount.value_uid.type),
+        FacetIntBounds.count,
+        FacetIntBounds.min_value,
+        FacetIntBounds.max_value,
+    ).where(FacetIntBounds.count > 0)
+
+    return union_all(total_stats, list_stats, int_stats)
+
+
+def collect_property_values(
+    list_values: Iterable[Tuple[UUID, UUID]],
+    int_values: Iterable[Tuple[UUID, int]],
+) -> Tuple[Dict[Tuple[UUID, UUID], int], Dict[UUID, List[int]]]:
+    """
+    Агрегация свойств товаров для FacetCountCRUD.
+
+    Args:
+        list_values: Пары (property_uid, value_uid) list-свойств.
+        int_values: Пары (property_uid, value) int-свойств.
+
+    Returns:
+        Количество на пару (property_uid, value_uid) и значения по int-свойствам.
+    """
+    list_counts: Dict[Tuple[UUID, UUID], int] = {}
+    for key in list_values:
+        list_counts[key] = list_counts.get(key, 0) + 1
+
+    int_groups: Dict[UUID, List[int]] = {}
+    for property_uid, value in int_values:
+        int_groups.setdefault(property_uid, []).append(value)
+
+    return list_counts, int_groups
+
+
+def build_delete_products_query(product_uids: List[UUID]) -> Select:
+    """
+    Удаление товаров одним запросом с подсчетом затронутых фасетов.
+
+    CTE deleted выполняет DELETE ... RETURNING, строки свойств удаляются
+    каскадом FK. Основной запрос читает снимок до удаления, поэтому свойства
+    удаленных товаров еще видны и агрегируются для FacetCountCRUD.
+
+    Строки результата: (kind, uid, value_uid, count, min, max), где kind -
+    "product" (UUID удаленного товара), "list" (количество на пару
+    property_uid, value_uid) или "int" (количество и min/max удаленных
+    значений int-свойства).
+    """
+    uids = bindparam("uids", list(product_uids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    deleted = (
+        delete(Product)
+        .where(Product.uid == any_(uids))
+        .returning(Product.uid)
+        .cte("deleted")
+    )
+
+    products = select(
+        literal_column("'product'").label("kind"),
+        deleted.c.uid.label("uid"),
+        cast(null(), ProductPropertyValue.value_uid.type).label("value_uid"),
+        cast(null(), Integer).label("count"),
+        cast(null(), Integer).label("min_value"),
+        cast(null(), Integer).label("max_value"),
+    )
+    list_values = (
+        select(
+            literal_column("'list'"),
+            ProductPropertyValue.property_uid,
+            ProductPropertyValue.value_uid,
+            func.count(),
+            cast(null(), Integer),
+            cast(null(), Integer),
+        )
+        .join(deleted, deleted.c.uid == ProductPropertyValue.product_uid)
+        .group_by(ProductPropertyValue.property_uid, ProductPropertyValue.value_uid)
+    )
+    int_values = (
+        select(
+            literal_column("'int'"),
+            ProductPropertyInt.property_uid,
+            cast(null(), ProductPropertyValue.value_uid.type),
+            func.count(),
+            func.min(ProductPropertyInt.value),
+            func.max(ProductPropertyInt.value),
+        )
+        .join(deleted, deleted.c.uid == ProductPropertyInt.product_uid)
+        .group_by(ProductPropertyInt.property_uid)
+    )
+    return union_all(products, list_values, int_values)
+
+
+def _int_bound_probe(descending: bool) -> ColumnElement:
+    """
+    Крайнее оставшееся значение int-свойства строки facet_int_bounds.
+
+    ORDER BY value LIMIT 1 читает одну запись индекса (property_uid, value,
+    product_uid), а не все значения свойства.
+    """
+    values = ProductPropertyInt.__table__
+    bounds = FacetIntBounds.__table__
+    return (
+        select(values.c.value)
+        .where(values.c.property_uid == bounds.c.property_uid)
+        .order_by(values.c.value.desc() if descending else values.c.value)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+class FacetCountCRUD:
+    """
+    Поддержка материализованных счетчиков фасетов.
+
+    Методы не делают commit: они вызываются внутри транзакции операции
+    записи, чтобы счетчики менялись атомарно вместе с товарами.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply_products_added(
+        self,
+        products: int,
+        list_values: Mapping[Tuple[UUID, UUID], int],
+        int_values: Mapping[UUID, List[int]],
+    ) -> None:
+        """
+        Учет добавленных товаров.
+
+        Args:
+            products: Количество добавленных товаров.
+            list_values: Количество товаров на пару (property_uid, value_uid).
+            int_values: Значения int-свойств добавленных товаров.
+        """
+        logger.debug("Увеличение счетчиков фасетов: %s товаров", products)
+
+        await self._add_counters(products)
+
+        if list_values:
+            stmt = insert(FacetCount).values(
+                [
+                    {
+                        "property_uid": property_uid,
+                        "value_uid": value_uid,
+                        "count": count,
+                    }
+                    for (property_uid, value_uid), count in list_values.items()
+                ]
+            )
+            await self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[FacetCount.property_uid, FacetCount.value_uid],
+                    set_={"count": FacetCount.count + stmt.excluded.count},
+                )
+            )
+
+        if int_values:
+            stmt = insert(FacetIntBounds).values(
+                [
+                    {
+                        "property_uid": property_uid,
+                        "count": len(values),
+                        "min_value": min(values),
+                        "max_value": max(values),
+                    }
+                    for property_uid, values in int_values.items()
+                ]
+            )
+            await self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[FacetIntBounds.property_uid],
+                    set_={
+                        "count": FacetIntBounds.count + stmt.excluded.count,
+                        "min_value": func.least(
+                            FacetIntBounds.min_value, stmt.excluded.min_value
+                        ),
+                        "max_value": func.greatest(
+                            FacetIntBounds.max_value, stmt.excluded.max_value
+                        ),
+                    },
+                )
+            )
+
+    async def apply_products_removed(
+        self,
+        products: int,
+        list_values: Mapping[Tuple[UUID, UUID], int],
+        int_values: Mapping[UUID, IntValuesRemoved],
+        refresh_bounds: bool = True,
+    ) -> None:
+        """
+        Учет удаленных товаров.
+
+        Вызывается после удаления строк свойств в той же транзакции.
+        Количество товаров int-свойства уменьшается на число удаленных
+        значений; min/max перечитываются, только если удаленное значение
+        достигало сохраненной границы.
+
+        Args:
+            products: Количество удаленных товаров.
+            list_values: Количество товаров на пару (property_uid, value_uid).
+            int_values: Количество и границы удаленных значений int-свойств.
+            refresh_bounds: Уточнить min/max сразу; иначе это делает
+                refresh_int_bounds после всех пачек удаления.
+        """
+        logger.debug("Уменьшение счетчиков фасетов: %s товаров", products)
+
+        await self._add_counters(-products)
+
+        if list_values:
+            # executemany по Core-таблице: одна подготовленная команда на все пары
+            table = FacetCount.__table__
+            await self.session.execute(
+                update(table)
+                .where(
+                    table.c.property_uid == bindparam("b_property_uid"),
+                    table.c.value_uid == bindparam("b_value_uid"),
+                )
+                .values(count=table.c.count - bindparam("b_count")),
+                [
+                    {
+                        "b_property_uid": property_uid,
+                        "b_value_uid": value_uid,
+                        "b_count": count,
+                    }
+                    for (property_uid, value_uid), count in list_values.items()
+                ],
+            )
+
+        if int_values:
+            await self._update_int_bounds(
+                int_values, subtract=True, refresh=refresh_bounds
+            )
+
+    async def refresh_int_bounds(
+        self, int_values: Mapping[UUID, IntValuesRemoved]
+    ) -> None:
+        """
+        Уточнение min/max int-свойств после удаления товаров.
+
+        Args:
+            int_values: Количество и границы удаленных значений int-свойств.
+        """
+        if int_values:
+            await self._update_int_bounds(int_values, subtract=False, refresh=True)
+
+    async def _update_int_bounds(
+        self,
+        int_values: Mapping[UUID, IntValuesRemoved],
+        subtract: bool,
+        refresh: bool,
+    ) -> None:
+        # executemany по Core-таблице: одна подготовленная команда на все свойства
+        table = FacetIntBounds.__table__
+        values = {}
+        if subtract:
+            values["count"] = table.c.count - bindparam("b_count")
+        if refresh:
+            # Граница, которой нет среди удаленных значений, остается прежней
+            values["min_value"] = case(
+                (table.c.min_value >= bindparam("b_min"), _int_bound_probe(False)),
+                else_=table.c.min_value,
+            )
+            values["max_value"] = case(
+                (table.c.max_value <= bindparam("b_max"), _int_bound_probe(True)),
+                else_=table.c.max_value,
+            )
+        await self.session.execute(
+            update(table)
+            .where(table.c.property_uid == bindparam("b_property_uid"))
+            .values(**values),
+            [
+                {
+                    "b_property_uid": property_uid,
+                    "b_count": removed.count,
+                    "b_min": removed.min_value,
+                    "b_max": removed.max_value,
+                }
+                for property_uid, removed in int_values.items()
+            ],
+        )
+
+    async def _add_counters(self, products: int) -> None:
+        """Изменение числа товаров и новое поколение каталога одним запросом."""
+        counters = insert(CatalogCounter).values(
+            [
+                {"name": PRODUCTS_COUNTER, "value": products},
+                {"name": GENERATION_COUNTER, "value": 1},
+            ]
+        )
+        await self.session.execute(
+            counters.on_conflict_do_update(
+                index_elements=[CatalogCounter.name],
+                set_={"value": CatalogCounter.value + counters.excluded.value},
+            )
+        )
+
+    async def bump_generation(self) -> None:
+        """Новое поколение каталога (запись свойств)."""
+        counter = insert(CatalogCounter).values(name=GENERATION_COUNTER, value=1)
+        await self.session.execute(
+            counter.on_conflict_do_update(
+                index_elements=[CatalogCounter.name],
+                set_={"value": CatalogCounter.value + counter.excluded.value},
+            )
+        )
+
+    async def remove_property(self, property_uid: UUID) -> None:
+        """Удаление счетчиков свойства и новое поколение каталога."""
+        await self.bump_generation()
+        await self.session.execute(
+            delete(FacetCount).where(FacetCount.property_uid == property_uid)
+        )
+        await self.session.execute(
+            delete(FacetIntBounds).where(FacetIntBounds.property_uid == property_uid)
+        )
@@ -0,0 +1,216 @@
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.filters import INT_MAX, INT_MIN, PROPERTY_KEY_PREFIX
+from indexes.property_cache import property_cache
+
+logger = logging.getLogger(__name__)
+
+SORT_FIELDS = ("name", "uid", "relevance")
+RANGE_SUFFIXES = {"_from": "from", "_to": "to"}
+
+
+class UnknownPropertyError(ValueError):
+    """Фильтр ссылается на свойство или значение, которых нет в снимке метаданных."""
+
+
+class FilterSpec(NamedTuple):
+    """
+    Разобранные параметры фильтрации каталога в канонической форме.
+
+    Ключи приведены к UUID известных свойств, свойства отсортированы по
+    UUID, значения list-свойств - без повторов и по возрастанию, поэтому
+    запросы, отличающиеся только порядком параметров, дают равные
+    FilterSpec с одинаковым key.
+
+    Attributes:
+        lists: Пары (UUID list-свойства, UUID значений).
+        ranges: Тройки (UUID int-свойства, нижняя граница, верхняя граница);
+            незаданная граница - None.
+        name: Строка поиска по имени.
+        sort: Поле сортировки.
+    """
+
+    lists: Tuple[Tuple[UUID, Tuple[UUID, ...]], ...] = ()
+    ranges: Tuple[Tuple[UUID, Optional[int], Optional[int]], ...] = ()
+    name: Optional[str] = None
+    sort: Optional[str] = None
+
+    @property
+    def filters(self) -> Dict[UUID, List[UUID]]:
+        """Фильтры list-свойств: UUID свойства -> UUID значений."""
+        return {
+            property_uid: list(value_uids) for property_uid, value_uids in self.lists
+        }
+
+    @property
+    def int_ranges(self) -> Dict[UUID, Dict[str, int]]:
+        """Диапазоны int-свойств: UUID свойства -> {"from": ..., "to": ...}."""
+        return {
+            property_uid: {
+                bound: value
+                for bound, value in (("from", value_from), ("to", value_to))
+                if value is not None
+            }
+            for property_uid, value_from, value_to in self.ranges
+        }
+
+    @property
+    def has_property_filters(self) -> bool:
+        return bool(self.lists or self.ranges)
+
+    @property
+    def key(self) -> str:
+        """Каноническая строка фильтра."""
+        parts = [
+            f"{property_uid}={','.join(map(str, value_uids))}"
+            for property_uid, value_uids in self.lists
+        ]
+        parts.extend(
+            f"{property_uid}=[{'' if value_from is None else value_from},"
+            f"{'' if value_to is None else value_to}]"
+            for property_uid, value_from, value_to in self.ranges
+        )
+        parts.append(f"name={self.name or ''}")
+        parts.append(f"sort={self.sort or ''}")
+        return "&".join(parts)
+
+    @property
+    def digest(self) -> str:
+        """Хэш канонической строки, одинаковый во всех процессах."""
+        return hashlib.sha1(self.key.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_property_uid(key: str) -> UUID:
+    try:
+        return UUID(key.removeprefix(PROPERTY_KEY_PREFIX))
+    except ValueError:
+        raise ValueError(f"Invalid property key: {key}")
+
+
+def parse_filter_spec(query_string: str) -> FilterSpec:
+    """
+    Разбор строки запроса каталога по текущему снимку метаданных свойств.
+
+    Результат запоминается в LRU-кэше по строке запроса и снимку
+    метаданных (settings.catalog.filter_spec_cache_size записей).
+
+    Args:
+        query_string: Сырая строка запроса из request.scope["query_string"].
+
+    Raises:
+        UnknownPropertyError: если свойство или значение отсутствует в снимке.
+        ValueError: при некорректном UUID, числе или типе фильтра.
+    """
+    return _parse_filter_spec(query_string, property_cache.snapshot_id)
+
+
+@lru_cache(maxsize=settings.catalog.filter_spec_cache_size)
+def _parse_filter_spec(query_string: str, snapshot_id: int) -> FilterSpec:
+    lists: Dict[UUID, set] = {}
+    ranges: Dict[UUID, Dict[str, int]] = {}
+    name = None
+    sort = None
+
+    for key, values in parse_qs(query_string).items():
+        if key == "name":
+            name = values[0]
+            continue
+        if key == "sort":
+            sort = values[0] if values[0] in SORT_FIELDS else None
+            continue
+        if not key.startswith(PROPERTY_KEY_PREFIX):
+            continue
+
+        bound = None
+        for suffix, range_bound in RANGE_SUFFIXES.items():
+            if key.endswith(suffix):
+                key, bound = key.removesuffix(suffix), range_bound
+                break
+        property_uid = parse_property_uid(key)
+        property_type = property_cache.types.get(property_uid)
+        if property_type is None:
+            raise UnknownPropertyError(f"Property {property_uid} does not exist")
+
+        if bound is not None:
+            if property_type != "int":
+                raise ValueError(f"Range filter requires int property: {property_uid}")
+            try:
+                bound_value = int(values[0])
+            except ValueError:
+                raise ValueError(f"Invalid {bound} value for property {property_uid}")
+            # Граница передается параметром INTEGER: вне диапазона - ошибка драйвера
+            if not INT_MIN <= bound_value <= INT_MAX:
+                raise ValueError(
+                    f"{bound} value for property {property_uid} is out of range "
+                    f"[{INT_MIN}, {INT_MAX}]"
+                )
+            ranges.setdefault(property_uid, {})[bound] = bound_value
+            continue
+
+        if property_type != "list":
+            raise ValueError(f"Value filter requires list property: {property_uid}")
+        known_values = property_cache.values.get(property_uid, ())
+        for value in values:
+            try:
+                value_uid = UUID(value)
+            except ValueError:
+                raise ValueError(f"Invalid value for property {property_uid}: {value}")
+            if value_uid not in known_values:
+                raise UnknownPropertyError(
+                    f"Property value {value_uid} does not exist "
+                    f"for property {property_uid}"
+                )
+            lists.setdefault(property_uid, set()).add(value_uid)
+
+    return FilterSpec(
+        lists=tuple(
+            (property_uid, tuple(sorted(lists[property_uid])))
+            for property_uid in sorted(lists)
+        ),
+        ranges=tuple(
+            (
+                property_uid,
+                ranges[property_uid].get("from"),
+                ranges[property_uid].get("to"),
+            )
+            for property_uid in sorted(ranges)
+        ),
+        name=name,
+        sort=sort,
+    )
+
+
+async def load_filter_spec(session: AsyncSession, query_string: str) -> FilterSpec:
+    """
+    Разбор параметров фильтрации до выполнения запросов каталога.
+
+    Снимок метаданных читается из БД, только если он устарел. Если фильтр
+    ссылается на неизвестное свойство (например, созданное другим
+    процессом), снимок перечитывается не чаще раза в RELOAD_INTERVAL
+    секунд и разбор повторяется.
+
+    Raises:
+        HTTPException: 422 при неизвестных свойствах или некорректных параметрах
+    """
+    await property_cache.ensure_loaded(session)
+    try:
+        try:
+            return parse_filter_spec(query_string)
+        except UnknownPropertyError:
+            if not await property_cache.reload(session):
+                raise
+            return parse_filter_spec(query_string)
+    except ValueError as e:
+        logger.warning("Некорректные параметры фильтрации: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
@@ -0,0 +1,413 @@
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import (
+    BindParameter,
+    Boolean,
+    ColumnElement,
+    Integer,
+    Select,
+    and_,
+    any_,
+    case,
+    cast,
+    distinct,
+    func,
+    intersect,
+    literal,
+    literal_column,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from models.facet_model import FacetCount, FacetIntBounds
+from models.product_model import Product, ProductPropertyValue, ProductPropertyInt
+
+PROPERTY_KEY_PREFIX = "property_"
+
+# Границы колонки INTEGER: ими заполняются незаданные концы диапазона
+INT_MIN = -(2**31)
+INT_MAX = 2**31 - 1
+
+
+def uuid_array(values: Iterable[UUID]) -> BindParameter:
+    """
+    Список UUID одним параметром-массивом (uuid[]).
+
+    В отличие от IN (...), текст запроса не зависит от длины списка, поэтому
+    запрос компилируется и подготавливается один раз.
+    """
+    return literal(list(values), ARRAY(PG_UUID(as_uuid=True)))
+
+
+class UuidIn(ColumnElement[bool]):
+    """
+    Принадлежность UUID списку: column = ANY($1::uuid[]) в PostgreSQL,
+    column IN (...) в остальных СУБД.
+
+    Оба варианта входят в ключ кэша компиляции, поэтому скомпилированный
+    запрос переиспользуется с новыми значениями, как обычный.
+    """
+
+    inherit_cache = True
+    type = Boolean()
+    _traverse_internals = [
+        ("any_clause", InternalTraversal.dp_clauseelement),
+        ("in_clause", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(self, column: ColumnElement, values: Iterable[UUID]) -> None:
+        values = list(values)
+        self.any_clause = column == any_(uuid_array(values))
+        self.in_clause = column.in_(values)
+
+
+@compiles(UuidIn)
+def _compile_uuid_in(element: UuidIn, compiler, **kw) -> str:
+    return compiler.process(element.in_clause, **kw)
+
+
+@compiles(UuidIn, "postgresql")
+def _compile_uuid_any(element: UuidIn, compiler, **kw) -> str:
+    return compiler.process(element.any_clause, **kw)
+
+
+def int_array(values: Iterable[int]) -> BindParameter:
+    """Список чисел одним параметром-массивом (integer[])."""
+    return literal(list(values), ARRAY(Integer))
+
+
+def list_filter_condition(
+    property_uid: UUID, value_uids: List[UUID]
+) -> ColumnElement[bool]:
+    """Полусоединение: у товара есть одно из значений list-свойства."""
+    return (
+        select(ProductPropertyValue.product_uid)
+        .where(
+            ProductPropertyValue.product_uid == Product.uid,
+            ProductPropertyValue.property_uid == property_uid,
+            ProductPropertyValue.value_uid == any_(uuid_array(value_uids)),
+        )
+        .exists()
+    )
+
+
+def range_filter_condition(
+    property_uid: UUID, range_values: Dict[str, int]
+) -> ColumnElement[bool]:
+    """
+    Полусоединение: значение int-свойства товара попадает в диапазон.
+
+    Обе границы присутствуют всегда (незаданные заменяются границами
+    INTEGER), чтобы форма запроса не зависела от того, какие указаны.
+    """
+    return (
+        select(ProductPropertyInt.product_uid)
+        .where(
+            ProductPropertyInt.product_uid == Product.uid,
+            ProductPropertyInt.property_uid == property_uid,
+            ProductPropertyInt.value >= range_values.get("from", INT_MIN),
+            ProductPropertyInt.value <= range_values.get("to", INT_MAX),
+        )
+        .exists()
+    )
+
+
+def build_property_conditions(
+    filters: Dict[UUID, List[UUID]],
+    ranges: Dict[UUID, Dict[str, int]],
+) -> Dict[UUID, ColumnElement[bool]]:
+    """
+    Компиляция фильтров в условия по каждому свойству.
+
+    Каждое свойство превращается в один EXISTS-подзапрос, поэтому запрос
+    не размножает строки товаров и не требует DISTINCT, сколько бы
+    фильтров ни было указано.
+
+    Args:
+        filters: Фильтры list-свойств (FilterSpec.filters).
+        ranges: Диапазоны int-свойств (FilterSpec.int_ranges).
+
+    Returns:
+        Словарь UUID свойства -> условие WHERE для запроса по таблице products.
+    """
+    conditions = {}
+
+    for property_uid, value_uids in filters.items():
+        conditions[property_uid] = list_filter_condition(property_uid, value_uids)
+
+    for property_uid, range_values in ranges.items():
+        condition = range_filter_condition(property_uid, range_values)
+        if property_uid in conditions:
+            condition = and_(conditions[property_uid], condition)
+        conditions[property_uid] = condition
+
+    return conditions
+
+
+def build_filter_conditions(
+    filters: Dict[UUID, List[UUID]],
+    ranges: Dict[UUID, Dict[str, int]],
+) -> List[ColumnElement[bool]]:
+    """
+    Компиляция фильтров в условия WHERE для запроса по таблице products.
+
+    Returns:
+        Список условий, которые нужно объединить через AND.
+    """
+    return list(build_property_conditions(filters, ranges).values())
+
+
+def build_array_filter_conditions(
+    filters: Dict[UUID, List[UUID]],
+    ranges: Dict[UUID, Dict[str, int]],
+) -> List[ColumnElement[bool]]:
+    """
+    Компиляция фильтров в условие фиксированной формы.
+
+    Все пары (свойство, значение) list-фильтров и все диапазоны int-свойств
+    передаются параметрами-массивами. unnest соединяется с таблицами свойств
+    по property_uid, поэтому строки читаются из покрывающих индексов, а
+    совпадения обоих видов сводятся в одну группировку: подходят товары, у
+    которых совпали все свойства. Текст запроса зависит только от наличия
+    фильтров каждого вида, а не от их числа.
+
+    Returns:
+        Не более одного условия.
+    """
+    matches = []
+
+    if filters:
+        # У товара не больше одной строки на свойство, поэтому без повторов
+        # пар каждое совпавшее свойство дает ровно одну строку
+        pairs = list(
+            dict.fromkeys(
+                (property_uid, value_uid)
+                for property_uid, value_uids in filters.items()
+                for value_uid in value_uids
+            )
+        )
+        list_filters = (
+            func.unnest(
+                uuid_array(property_uid for property_uid, _ in pairs),
+                uuid_array(value_uid for _, value_uid in pairs),
+            )
+            .table_valued("property_uid", "value_uid")
+            .render_derived(name="list_filters")
+        )
+        matches.append(
+            select(ProductPropertyValue.product_uid).join(
+                list_filters,
+                and_(
+                    ProductPropertyValue.property_uid == list_filters.c.property_uid,
+                    ProductPropertyValue.value_uid == list_filters.c.value_uid,
+                ),
+            )
+        )
+
+    if ranges:
+        bounds = (
+            func.unnest(
+                uuid_array(ranges),
+                int_array(values.get("from", INT_MIN) for values in ranges.values()),
+                int_array(values.get("to", INT_MAX) for values in ranges.values()),
+            )
+            .table_valued("property_uid", "value_from", "value_to")
+            .render_derived(name="range_filters")
+        )
+        matches.append(
+            select(ProductPropertyInt.product_uid).join(
+                bounds,
+                and_(
+                    ProductPropertyInt.property_uid == bounds.c.property_uid,
+                    ProductPropertyInt.value >= bounds.c.value_from,
+                    ProductPropertyInt.value <= bounds.c.value_to,
+                ),
+            )
+        )
+
+    if not matches:
+        return []
+
+    matched = (matches[0] if len(matches) == 1 else union_all(*matches)).subquery(
+        "matched"
+    )
+    return [
+        Product.uid.in_(
+            select(matched.c.product_uid)
+            .group_by(matched.c.product_uid)
+            .having(func.count() == literal(len(filters) + len(ranges)))
+        )
+    ]
+
+
+def build_property_matches(
+    filters: Dict[UUID, List[UUID]],
+    ranges: Dict[UUID, Dict[str, int]],
+) -> Dict[UUID, Select]:
+    """
+    Компиляция фильтров в выборки UUID подходящих товаров по каждому свойству.
+
+    Выборки начинаются с property_uid и читаются из покрывающих индексов
+    без обращения к таблице products. Список значений и диапазон по одному
+    свойству пересекаются.
+
+    Returns:
+        Словарь UUID свойства -> SELECT product_uid.
+    """
+    matches: Dict[UUID, Select] = {}
+
+    for property_uid, value_uids in filters.items():
+        matches[property_uid] = select(ProductPropertyValue.product_uid).where(
+            ProductPropertyValue.property_uid == property_uid,
+            ProductPropertyValue.value_uid == any_(uuid_array(value_uids)),
+        )
+
+    for property_uid, range_values in ranges.items():
+        match = select(ProductPropertyInt.product_uid).where(
+            ProductPropertyInt.property_uid == property_uid,
+            ProductPropertyInt.value >= range_values.get("from", INT_MIN),
+            ProductPropertyInt.value <= range_values.get("to", INT_MAX),
+        )
+        if property_uid in matches:
+            match = intersect(matches[property_uid], match)
+        matches[property_uid] = match
+
+    return matches
+
+
+def build_facet_statistics_query(
+    filters: Dict[UUID, List[UUID]],
+    ranges: Dict[UUID, Dict[str, int]],
+) -> Select:
+    """
+    Один запрос дизъюнктивной статистики фасетов.
+
+    CTE flags содержит товары, не прошедшие не более одного фильтра, и
+    флаг прохождения каждого фильтра. Кандидаты собираются из выборок
+    build_property_matches (товары, прошедшие хотя бы один фильтр), поэтому
+    размер CTE зависит от числа подходящих товаров, а не от размера
+    каталога. По каждому свойству учитываются товары, прошедшие все фильтры,
+    кроме фильтра по самому этому свойству. При единственном фильтре такие
+    товары - весь каталог: статистика по его свойству читается из
+    материализованных счетчиков.
+
+    Строки результата: (kind, property_uid, value_uid, count, min, max), где
+    kind - "total" (число товаров под всеми фильтрами), "list" (число товаров
+    на значение list-свойства) или "int" (min/max int-свойства).
+
+    Args:
+        filters: Фильтры list-свойств (FilterSpec.filters).
+        ranges: Диапазоны int-свойств (FilterSpec.int_ranges).
+
+    Returns:
+        Запрос SELECT ... UNION ALL ...
+    """
+    filtered = list(build_property_matches(filters, ranges).items())
+    total_filters = len(filtered)
+
+    hits = union_all(
+        *(
+            select(match.subquery().c.product_uid, literal_column(str(i)).label("f"))
+            for i, (_, match) in enumerate(filtered)
+        )
+    ).subquery("hits")
+    flags = (
+        select(
+            hits.c.product_uid,
+            *(
+                func.max(case((hits.c.f == i, 1), else_=0)).label(f"f{i}")
+                for i in range(total_filters)
+            ),
+        )
+        .group_by(hits.c.product_uid)
+        .having(func.count(distinct(hits.c.f)) >= total_filters - 1)
+    )
+    flags = flags.cte("flags").prefix_with("MATERIALIZED")
+    flag_columns = [flags.c[f"f{i}"] for i in range(total_filters)]
+    score = sum(flag_columns[1:], flag_columns[0])
+    matched = select(*flags.c, score.label("score")).cte("matched")
+
+    def allowed(property_column) -> ColumnElement[bool]:
+        # Фильтр по самому свойству не учитывается при подсчете его значений
+        everything = matched.c.score == total_filters
+        if total_filters == 1:
+            # Значения свойства единственного фильтра читаются из счетчиков
+            return and_(property_column != filtered[0][0], everything)
+        return case(
+            *(
+                (
+                    property_column == property_uid,
+                    matched.c.score - matched.c[f"f{i}"] == total_filters - 1,
+                )
+                for i, (property_uid, _) in enumerate(filtered)
+            ),
+            else_=everything,
+        )
+
+    total_stats = select(
+        literal_column("'total'").label("kind"),
+        cast(null(), ProductPropertyValue.property_uid.type).label("property_uid"),
+        cast(null(), ProductPropertyValue.value_uid.type).label("value_uid"),
+        func.count().label("count"),
+        cast(null(), Integer).label("min_value"),
+        cast(null(), Integer).label("max_value"),
+    ).where(matched.c.score == total_filters)
+
+    list_stats = (
+        select(
+            literal_column("'list'"),
+            ProductPropertyValue.property_uid,
+            ProductPropertyValue.value_uid,
+            func.count(),
+            cast(null(), Integer),
+            cast(null(), Integer),
+        )
+        .join(matched, matched.c.product_uid == ProductPropertyValue.product_uid)
+        .where(allowed(ProductPropertyValue.property_uid))
+        .group_by(ProductPropertyValue.property_uid, ProductPropertyValue.value_uid)
+    )
+
+    int_stats = (
+        select(
+            literal_column("'int'"),
+            ProductPropertyInt.property_uid,
+            cast(null(), ProductPropertyValue.value_uid.type),
+            func.count(),
+            func.min(ProductPropertyInt.value),
+            func.max(ProductPropertyInt.value),
+        )
+        .join(matched, matched.c.product_uid == ProductPropertyInt.product_uid)
+        .where(allowed(ProductPropertyInt.property_uid))
+        .group_by(ProductPropertyInt.property_uid)
+    )
+
+    if total_filters > 1:
+        return union_all(total_stats, list_stats, int_stats)
+
+    # Значения свойства единственного фильтра по всему каталогу
+    property_uid = filtered[0][0]
+    counted_list_stats = select(
+        literal_column("'list'"),
+        FacetCount.property_uid,
+        FacetCount.value_uid,
+        FacetCount.count,
+        cast(null(), Integer),
+        cast(null(), Integer),
+    ).where(FacetCount.property_uid == property_uid, FacetCount.count > 0)
+    counted_int_stats = select(
+        literal_column("'int'"),
+        FacetIntBounds.property_uid,
+        cast(null(), FacetCount.value_uid.type),
+        FacetIntBounds.count,
+        FacetIntBounds.min_value,
+        FacetIntBounds.max_value,
+    ).where(FacetIntBounds.property_uid == property_uid, FacetIntBounds.count > 0)
+
+    return union_all(
+        total_stats, list_stats, int_stats, counted_list_stats, counted_int_stats
+    )
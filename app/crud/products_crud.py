@@ -1,15 +1,53 @@
 import logging
 
-from typing import List, Optional, Dict, Tuple
-from uuid import UUID
+from typing import Any, AsyncIterator, List, Optional, Dict, Tuple
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
-
+from sqlalchemy import (
+    ColumnElement,
+    any_,
+    bindparam,
+    Row,
+    Select,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from core.cache import catalog_generation
+from core.config import settings
+from crud.facet_counts_crud import (
+    FacetCountCRUD,
+    IntValuesRemoved,
+    build_delete_products_query,
+    build_facet_counts_query,
+    collect_property_values,
+    merge_int_values_removed,
+)
+from crud.filters import (
+    PROPERTY_KEY_PREFIX,
+    build_array_filter_conditions,
+    build_facet_statistics_query,
+    build_filter_conditions,
+    uuid_array,
+)
+from crud.filter_spec import FilterSpec
+from crud.projection import build_page_projection_query
+from indexes.facet_index import facet_index
+from indexes.int_columns import int_columns
+from indexes.name_search import name_search
+from indexes.ordinals import product_ordinals
+from indexes.property_cache import property_cache
+from indexes.statistics import compute_statistics, statistics_available
 from models.product_model import Product, ProductPropertyValue, ProductPropertyInt
-from models.properties_model import Property, PropertyValue
 from schemas.catalog_schema import PropertyStats
 from schemas.product_schema import ProductCreate
 
@@ -28,7 +66,11 @@ class ProductCRUD:
 
     async def get_product(self, product_uid: UUID) -> Product:
         """
-        Получение товара по UUID
+        Получение товара по UUID вместе с int-свойствами
+
+        list-свойства не загружаются: по товару уже можно проверить
+        условный запрос (ETag по updated_at), значения дочитываются
+        load_property_values только для ответа с телом.
 
         Args:
             product_uid: UUID товара
@@ -39,33 +81,74 @@ class ProductCRUD:
         Raises:
             HTTPException: 404 если товар не найден
         """
-        logger.info(f"Получение товара с UUID: {product_uid}")
+        logger.info("Получение товара с UUID: %s", product_uid)
         try:
+            # int-свойства одного товара читаются в том же запросе (JOIN)
             result = await self.session.execute(
                 select(Product)
                 .where(Product.uid == product_uid)
                 .options(
-                    selectinload(Product.property_values).joinedload(
-                        ProductPropertyValue.value
-                    ),
-                    selectinload(Product.property_ints),
+                    joinedload(Product.property_ints),
+                    noload(Product.property_values),
                 )
             )
-            product = result.scalars().first()
+            product = result.unique().scalars().first()
 
             if not product:
-                logger.warning(f"Товар с UUID {product_uid} не найден")
+                logger.warning("Товар с UUID %s не найден", product_uid)
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
                 )
 
-            logger.debug(f"Успешно получен товар: {product_uid}")
+            logger.debug("Успешно получен товар: %s", product_uid)
             return product
 
         except Exception as e:
-            logger.error(f"Ошибка при получении товара {product_uid}: {str(e)}")
+            logger.error("Ошибка при получении товара %s: %s", product_uid, e)
             raise
 
+    async def load_property_values(self, product: Product) -> Product:
+        """
+        Загрузка list-свойств со значениями товара, полученного get_product.
+
+        Один запрос: связи товара со значениями и сами значения (JOIN).
+        """
+        result = await self.session.scalars(
+            select(ProductPropertyValue)
+            .where(ProductPropertyValue.product_uid == product.uid)
+            .options(joinedload(ProductPropertyValue.value))
+        )
+        set_committed_value(product, "property_values", list(result))
+        return product
+
+    async def get_products(self, product_uids: List[UUID]) -> Dict[UUID, Product]:
+        """
+        Получение нескольких товаров по UUID.
+
+        Товары выбираются одним запросом WHERE uid = ANY(:uids) с одним
+        параметром-массивом (план запроса не зависит от числа UUID), свойства
+        догружаются пачками через selectinload.
+
+        Args:
+            product_uids: UUID товаров
+
+        Returns:
+            Найденные товары по UUID
+        """
+        logger.info("Получение %s товаров", len(product_uids))
+        uids = bindparam("uids", list(product_uids), type_=ARRAY(PG_UUID(as_uuid=True)))
+        result = await self.session.execute(
+            select(Product)
+            .where(Product.uid == any_(uids))
+            .options(
+                selectinload(Product.property_values),
+                selectinload(Product.property_ints),
+            )
+        )
+        products = {product.uid: product for product in result.scalars()}
+        logger.debug("Найдено %s из %s товаров", len(products), len(product_uids))
+        return products
+
     async def create_product(self, product_data: ProductCreate) -> Product:
         """
         Создание нового товара с валидацией свойств
@@ -77,73 +160,29 @@ class ProductCRUD:
             Product: Созданный товар
 
         Raises:
-            HTTPException: 400 при ошибках валидации
+            HTTPException: 400 при ошибках валидации и нарушении ограничений БД
             HTTPException: 500 при ошибках базы данных
         """
-        logger.info(f"Создание товара с данными: {product_data}")
+        logger.info("Создание товара с данными: %s", product_data)
 
         try:
-            # Проверяем существование всех свойств и их типы
-            properties_info = {}
-            for prop in product_data.properties:
-                logger.debug(f"Проверка свойства {prop.uid}")
-
-                # Получаем информацию о свойстве
-                prop_result = await self.session.execute(
-                    select(Property).where(Property.uid == prop.uid)
+            # Проверяем свойства по кэшу метаданных, без запросов к БД
+            await property_cache.prepare(self.session, [product_data.properties])
+            detail = property_cache.check(product_data.properties)
+            if detail:
+                logger.warning("Некорректные свойства товара: %s", detail)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail=detail
                 )
-                db_property = prop_result.scalars().first()
+            properties_info = {
+                prop.uid: property_cache.types[prop.uid]
+                for prop in product_data.properties
+            }
 
-                if not db_property:
-                    logger.warning(f"Свойство {prop.uid} не найдено")
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Property {prop.uid} does not exist",
-                    )
-
-                properties_info[prop.uid] = db_property.type
-
-                # Валидация в зависимости от типа свойства
-                if db_property.type == "list" and not prop.value_uid:
-                    logger.warning(f"Для свойства {prop.uid} не указан value_uid")
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Property {prop.uid} requires value_uid (type: list)",
-                    )
-                elif db_property.type == "int" and prop.value is None:
-                    logger.warning(f"Для свойства {prop.uid} не указано значение")
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Property {prop.uid} requires value (type: int)",
-                    )
-                elif db_property.type == "int" and prop.value_uid:
-                    logger.warning(
-                        f"Для числового свойства {prop.uid} указан value_uid"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Property {prop.uid} shouldn't have value_uid (type: int)",
-                    )
-
-                # Для свойств типа "list" проверяем существование value_uid
-                if prop.value_uid:
-                    value_exists = await self.session.execute(
-                        select(PropertyValue)
-                        .where(PropertyValue.uid == prop.value_uid)
-                        .where(PropertyValue.property_uid == prop.uid)
-                    )
-                    if not value_exists.scalars().first():
-                        logger.warning(f"Значение свойства {prop.value_uid} не найдено")
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail=f"Property value {prop.value_uid} does not exist for property {prop.uid}",
-                        )
-
-            # Создаем продукт
-            product = Product(name=product_data.name)
+            # Создаем продукт; все строки вставляются одним flush при commit
+            product = Product(uid=uuid4(), name=product_data.name)
             self.session.add(product)
-            await self.session.flush()
-            logger.debug(f"Создан продукт с UUID: {product.uid}")
+            logger.debug("Создан продукт с UUID: %s", product.uid)
 
             # Добавляем свойства
             for prop in product_data.properties:
@@ -157,32 +196,223 @@ class ProductCRUD:
                     )
                     self.session.add(prop_value)
                     logger.debug(
-                        f"Добавлено list-свойство: {prop.uid}={prop.value_uid}"
+                        "Добавлено list-свойство: %s=%s", prop.uid, prop.value_uid
                     )
                 else:  # 'int'
                     prop_int = ProductPropertyInt(
                         product_uid=product.uid, property_uid=prop.uid, value=prop.value
                     )
                     self.session.add(prop_int)
-                    logger.debug(f"Добавлено int-свойство: {prop.uid}={prop.value}")
+                    logger.debug("Добавлено int-свойство: %s=%s", prop.uid, prop.value)
+
+            # Обновляем счетчики фасетов в той же транзакции
+            list_values = [
+                (prop.uid, prop.value_uid)
+                for prop in product_data.properties
+                if properties_info[prop.uid] == "list"
+            ]
+            int_values = [
+                (prop.uid, prop.value)
+                for prop in product_data.properties
+                if properties_info[prop.uid] == "int"
+            ]
+            list_counts, int_groups = collect_property_values(list_values, int_values)
+            await FacetCountCRUD(self.session).apply_products_added(
+                1, list_counts, int_groups
+            )
 
             await self.session.commit()
-            await self.session.refresh(product)
-            logger.info(f"Успешно создан товар: {product.uid}")
+            catalog_generation.bump()
+            facet_index.add_product(product.uid, product.name, list_values)
+            int_columns.add_product(product.uid, product.name, int_values)
+            name_search.add_product(product.uid, product.name)
+            logger.info("Успешно создан товар: %s", product.uid)
             return product
 
         except HTTPException:
             await self.session.rollback()
             raise
 
+        except IntegrityError as e:
+            await self.session.rollback()
+            detail = await self._integrity_error_detail(product_data, e)
+            logger.warning("Товар не создан: %s", detail)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
         except Exception as e:
             await self.session.rollback()
-            logger.error(f"Ошибка при создании товара: {str(e)}", exc_info=True)
+            logger.error("Ошибка при создании товара: %s", e, exc_info=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating product: {str(e)}",
             )
 
+    async def bulk_create_products(
+        self, items: List[Tuple[int, ProductCreate]], retry: bool = True
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Массовое создание товаров одной транзакцией.
+
+        Свойства товаров проверяются по кэшу метаданных, существование
+        товаров - одним запросом по множеству UUID; корректные товары вставляются
+        многострочными INSERT. Товары с ошибками пропускаются.
+
+        Args:
+            items: Пары (номер в запросе, данные товара).
+            retry: После нарушения ограничений БД повторить проверку и
+                вставку товаров, которые ее прошли.
+
+        Returns:
+            created: Количество созданных товаров.
+            errors: Ошибки по товарам: {"index", "uid", "detail"}.
+        """
+        logger.info("Массовое создание %s товаров", len(items))
+
+        product_uids = [product.uid for _, product in items]
+
+        # Проверочный запрос по множеству UUID и кэш метаданных свойств
+        existing = set()
+        if product_uids:
+            result = await self.session.execute(
+                select(Product.uid).where(Product.uid.in_(product_uids))
+            )
+            existing = set(result.scalars().all())
+        await property_cache.prepare(
+            self.session, (product.properties for _, product in items)
+        )
+        property_types = property_cache.types
+
+        errors = []
+        seen = set()
+        products, list_rows, int_rows = [], [], []
+        for index, product_data in items:
+            detail = None
+            if product_data.uid in existing or product_data.uid in seen:
+                detail = f"Product {product_data.uid} already exists"
+            else:
+                detail = property_cache.check(product_data.properties)
+            if detail:
+                errors.append(
+                    {"index": index, "uid": str(product_data.uid), "detail": detail}
+                )
+                continue
+
+            seen.add(product_data.uid)
+            products.append(product_data)
+            for prop in product_data.properties:
+                if property_types[prop.uid] == "list":
+                    list_rows.append(
+                        {
+                            "product_uid": product_data.uid,
+                            "property_uid": prop.uid,
+                            "value_uid": prop.value_uid,
+                        }
+                    )
+                else:
+                    int_rows.append(
+                        {
+                            "product_uid": product_data.uid,
+                            "property_uid": prop.uid,
+                            "value": prop.value,
+                        }
+                    )
+
+        if not products:
+            return 0, errors
+
+        try:
+            await self.session.execute(
+                insert(Product),
+                [{"uid": product.uid, "name": product.name} for product in products],
+            )
+            if list_rows:
+                await self.session.execute(insert(ProductPropertyValue), list_rows)
+            if int_rows:
+                await self.session.execute(insert(ProductPropertyInt), int_rows)
+
+            # Обновляем счетчики фасетов в той же транзакции
+            list_counts, int_groups = collect_property_values(
+                [(row["property_uid"], row["value_uid"]) for row in list_rows],
+                [(row["property_uid"], row["value"]) for row in int_rows],
+            )
+            await FacetCountCRUD(self.session).apply_products_added(
+                len(products), list_counts, int_groups
+            )
+            await self.session.commit()
+
+        except IntegrityError as e:
+            await self.session.rollback()
+            logger.warning("Ошибка целостности при массовом создании товаров: %s", e)
+            if retry:
+                # UUID занят параллельной вставкой или свойство удалено другим
+                # процессом: повторная попытка одним запросом находит занятые
+                # UUID, по перечитанному снимку отклоняет товары с удаленными
+                # свойствами и вставляет остальные
+                await property_cache.reload(self.session)
+                return await self.bulk_create_products(items, retry=False)
+            errors.extend(
+                {
+                    "index": index,
+                    "uid": str(product.uid),
+                    "detail": f"Product violates database constraints: {e.orig}",
+                }
+                for index, product in items
+                if product.uid in seen
+            )
+            return 0, sorted(errors, key=lambda error: error["index"])
+
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Ошибка при массовом создании товаров: %s", e)
+            errors.extend(
+                {
+                    "index": index,
+                    "uid": str(product.uid),
+                    "detail": f"Error creating product: {str(e)}",
+                }
+                for index, product in items
+                if product.uid in seen
+            )
+            return 0, sorted(errors, key=lambda error: error["index"])
+
+        catalog_generation.bump()
+        list_values: Dict[UUID, List[Tuple[UUID, UUID]]] = {}
+        for row in list_rows:
+            list_values.setdefault(row["product_uid"], []).append(
+                (row["property_uid"], row["value_uid"])
+            )
+        int_values: Dict[UUID, List[Tuple[UUID, int]]] = {}
+        for row in int_rows:
+            int_values.setdefault(row["product_uid"], []).append(
+                (row["property_uid"], row["value"])
+            )
+        for product in products:
+            facet_index.add_product(
+                product.uid, product.name, list_values.get(product.uid, [])
+            )
+            int_columns.add_product(
+                product.uid, product.name, int_values.get(product.uid, [])
+            )
+            name_search.add_product(product.uid, product.name)
+
+        logger.info("Создано %s товаров, ошибок: %s", len(products), len(errors))
+        return len(products), errors
+
+    async def _integrity_error_detail(
+        self, product_data: ProductCreate, error: IntegrityError
+    ) -> str:
+        """
+        Описание нарушения ограничений БД при вставке товара.
+
+        Свойство или значение могло быть удалено другим процессом после
+        загрузки снимка метаданных: снимок перечитывается, и товар
+        проверяется повторно.
+        """
+        await property_cache.reload(self.session)
+        return property_cache.check(product_data.properties) or (
+            f"Product violates database constraints: {error.orig}"
+        )
+
     async def delete_product(self, product_uid: UUID) -> None:
         """
         Удаление товара по UUID
@@ -194,198 +424,457 @@ class ProductCRUD:
             HTTPException: 404 если товар не найден
             HTTPException: 500 при ошибках базы данных
         """
-        logger.info(f"Удаление товара с UUID: {product_uid}")
+        logger.info("Удаление товара с UUID: %s", product_uid)
+        deleted = await self.delete_products([product_uid])
+        if not deleted:
+            logger.warning("Товар с UUID %s не найден", product_uid)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
+            )
+        logger.info("Товар %s успешно удален", product_uid)
+
+    async def delete_products(
+        self,
+        product_uids: List[UUID],
+        int_values_removed: Optional[Dict[UUID, IntValuesRemoved]] = None,
+    ) -> List[UUID]:
+        """
+        Удаление товаров по списку UUID одной транзакцией.
+
+        Товары удаляются одним DELETE ... RETURNING без загрузки в ORM,
+        строки свойств - каскадом в БД; счетчики фасетов обновляются по
+        агрегатам того же запроса.
+
+        Args:
+            product_uids: UUID товаров для удаления
+            int_values_removed: Агрегаты удаленных значений int-свойств всего
+                запроса. Если передан, агрегаты пачки добавляются в него, а
+                min/max уточняются вызовом refresh_int_bounds после всех пачек.
+
+        Returns:
+            UUID удаленных товаров
+
+        Raises:
+            HTTPException: 500 при ошибках базы данных
+        """
+        logger.info("Удаление %s товаров", len(product_uids))
         try:
-            product = await self.get_product(product_uid)
-            await self.session.delete(product)
+            result = await self.session.execute(
+                build_delete_products_query(product_uids)
+            )
+            deleted, list_counts, int_values = [], {}, {}
+            for kind, uid, value_uid, count, min_value, max_value in result:
+                if kind == "product":
+                    deleted.append(uid)
+                elif kind == "list":
+                    list_counts[(uid, value_uid)] = count
+                else:
+                    int_values[uid] = IntValuesRemoved(count, min_value, max_value)
+
+            if deleted:
+                # Обновляем счетчики фасетов в той же транзакции
+                await FacetCountCRUD(self.session).apply_products_removed(
+                    len(deleted),
+                    list_counts,
+                    int_values,
+                    refresh_bounds=int_values_removed is None,
+                )
             await self.session.commit()
-            logger.info(f"Товар {product_uid} успешно удален")
-
-        except HTTPException:
-            raise
+            if int_values_removed is not None:
+                merge_int_values_removed(int_values_removed, int_values)
 
         except Exception as e:
             await self.session.rollback()
-            logger.error(
-                f"Ошибка при удалении товара {product_uid}: {str(e)}", exc_info=True
+            logger.error("Ошибка при удалении товаров: %s", e, exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error deleting product: {str(e)}",
             )
+
+        if deleted:
+            catalog_generation.bump()
+        for uid in deleted:
+            facet_index.remove_product(uid)
+            int_columns.remove_product(uid)
+            name_search.remove_product(uid)
+        logger.info("Удалено %s товаров", len(deleted))
+        return deleted
+
+    async def refresh_int_bounds(
+        self, int_values_removed: Dict[UUID, IntValuesRemoved]
+    ) -> None:
+        """
+        Уточнение min/max int-свойств после пачек delete_products.
+
+        Raises:
+            HTTPException: 500 при ошибках базы данных
+        """
+        try:
+            await FacetCountCRUD(self.session).refresh_int_bounds(int_values_removed)
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.error("Ошибка при обновлении границ int-свойств: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error deleting product: {str(e)}",
             )
+        catalog_generation.bump()
 
     async def filter_products(
         self,
-        filters: Dict[str, List[str]],
-        ranges: Dict[str, Dict[str, int]],
-        name: Optional[str] = None,
-        sort: Optional[str] = None,
+        spec: FilterSpec,
         page: int = 1,
         page_size: int = 10,
+        after: Optional[Tuple[Any, ...]] = None,
     ) -> Tuple[List[Product], int]:
         """
         Фильтрация товаров с учетом параметров.
 
         Args:
-            filters: Фильтры для свойств типа list.
-            ranges: Диапазоны для свойств типа int.
-            name: Имя товара для поиска (частичное совпадение).
-            sort: Поле для сортировки ("name" или "uid").
+            spec: Фильтры, поиск по имени (бэкенд задается settings.search) и
+                поле сортировки ("name", "uid" или "relevance" при поиске по
+                имени, по умолчанию "uid").
             page: Номер страницы.
             page_size: Размер страницы.
+            after: Ключ последнего товара предыдущей страницы (keyset-пагинация).
+                Если указан, page игнорируется.
 
         Returns:
             products: Список отфильтрованных товаров.
             total: Общее количество товаров, соответствующих фильтрам.
         """
-        logger.info(
-            f"Фильтрация товаров с параметрами: {filters}, {ranges}, {name}, {sort}"
-        )
+        logger.info("Фильтрация товаров с параметрами: %s", spec.key)
 
         try:
-            query = select(Product).options(
-                selectinload(Product.property_values).joinedload(
-                    ProductPropertyValue.value
-                ),
-                selectinload(Product.property_ints),
-            )
-
-            # Применение фильтров
-            if filters:
-                for prop_uid, value_uids in filters.items():
-                    query = query.join(Product.property_values).where(
-                        and_(
-                            ProductPropertyValue.property_uid == prop_uid,
-                            ProductPropertyValue.value_uid.in_(value_uids),
-                        )
-                    )
-
-            # Применение диапазонов
-            if ranges:
-                for prop_uid, range_values in ranges.items():
-                    query = query.join(Product.property_ints).where(
-                        and_(
-                            ProductPropertyInt.property_uid == prop_uid,
-                            ProductPropertyInt.value
-                            >= range_values.get("from", float("-inf")),
-                            ProductPropertyInt.value
-                            <= range_values.get("to", float("inf")),
+            # Фильтры без поиска по имени: выборку строят in-memory индексы
+            if self._use_indexes(spec):
+                uids, total = self._indexed_page(spec, page, page_size, after)
+                products = []
+                if uids:
+                    result = await self.session.execute(
+                        select(Product)
+                        .where(Product.uid == any_(uuid_array(uids)))
+                        .options(
+                            selectinload(Product.property_values).joinedload(
+                                ProductPropertyValue.value
+                            ),
+                            selectinload(Product.property_ints),
                         )
                     )
+                    by_uid = {product.uid: product for product in result.scalars()}
+                    products = [by_uid[uid] for uid in uids if uid in by_uid]
 
-            # Поиск по имени
-            if name:
-                query = query.where(Product.name.ilike(f"%{name}%"))
-
-            # Подсчет общего количества товаров
-            total_query = select(func.count()).select_from(query.subquery())
-            total = await self.session.execute(total_query)
-            total = total.scalar()
+                logger.info("Найдено %s товаров из %s (индекс)", len(products), total)
+                return products, total
 
-            # Пагинация и сортировка
-            if sort == "name":
-                query = query.order_by(Product.name)
-            elif sort == "uid":
-                query = query.order_by(Product.uid)
+            conditions = self._search_conditions(spec)
 
-            query = query.offset((page - 1) * page_size).limit(page_size)
+            # Общее количество - некоррелированный подзапрос в запросе
+            # страницы: отдельный COUNT нужен только для пустой страницы
+            total_query = select(func.count(Product.uid)).where(*conditions)
+            query = (
+                select(Product, total_query.correlate(None).scalar_subquery())
+                .where(*conditions)
+                .options(
+                    selectinload(Product.property_values).joinedload(
+                        ProductPropertyValue.value
+                    ),
+                    selectinload(Product.property_ints),
+                )
+            )
+            query, _ = self._paginate(query, spec, page, page_size, after)
 
             result = await self.session.execute(query)
-            products = result.scalars().all()
-
-            logger.info(f"Найдено {len(products)} товаров из {total}")
+            rows = result.all()
+            products = [product for product, _ in rows]
+            if rows:
+                total = rows[0][1]
+            else:
+                total = await self.session.scalar(total_query)
+
+            logger.info("Найдено %s товаров из %s", len(products), total)
             return products, total
 
         except Exception as e:
-            logger.error(f"Ошибка при фильтрации товаров: {str(e)}")
+            logger.error("Ошибка при фильтрации товаров: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error filtering products: {str(e)}",
             )
 
-    async def get_filter_statistics(
+    async def filter_products_json(
         self,
-        filters: Dict[str, List[str]],
-        ranges: Dict[str, Dict[str, int]],
-    ) -> Dict[str, PropertyStats]:
+        spec: FilterSpec,
+        page: int = 1,
+        page_size: int = 10,
+        after: Optional[Tuple[Any, ...]] = None,
+    ) -> Tuple[List[Row], int]:
         """
-        Получение статистики по фильтрам.
+        Фильтрация товаров с проекцией страницы в JSON на стороне БД.
 
-        Args:
-            filters: Фильтры для свойств типа list.
-            ranges: Диапазоны для свойств типа int.
+        Параметры те же, что у filter_products. Страница, общее количество
+        и свойства товаров читаются одним запросом без создания ORM-объектов.
 
         Returns:
-            Словарь с статистикой по свойствам.
+            rows: Строки (uid, name, product) в порядке сортировки, где
+                product - JSON товара в виде текста.
+            total: Общее количество товаров, соответствующих фильтрам.
         """
-        query = select(Product).options(
-            selectinload(Product.property_values),
-            selectinload(Product.property_ints),
-        )
+        logger.info("Фильтрация товаров (JSON) с параметрами: %s", spec.key)
 
-        # Применение фильтров
-        if filters:
-            for prop_uid, value_uids in filters.items():
-                query = query.join(Product.property_values).where(
-                    and_(
-                        ProductPropertyValue.property_uid == prop_uid,
-                        ProductPropertyValue.value_uid.in_(value_uids),
+        try:
+            if self._use_indexes(spec):
+                uids, total = self._indexed_page(spec, page, page_size, after)
+                # Порядок страницы - позиция uid в параметре-массиве
+                page_uids = uuid_array(uids)
+                page_query = (
+                    select(
+                        Product.uid,
+                        Product.name,
+                        func.array_position(page_uids, Product.uid).label("position"),
                     )
+                    .where(Product.uid == any_(page_uids))
+                    .subquery("page")
                 )
-
-        if ranges:
-            for prop_uid, range_values in ranges.items():
-                query = query.join(Product.property_ints).where(
-                    and_(
-                        ProductPropertyInt.property_uid == prop_uid,
-                        ProductPropertyInt.value
-                        >= range_values.get("from", float("-inf")),
-                        ProductPropertyInt.value
-                        <= range_values.get("to", float("inf")),
-                    )
+                total_expression = literal(total)
+            else:
+                conditions = self._search_conditions(spec)
+                page_query, order_by = self._paginate(
+                    select(Product.uid, Product.name).where(*conditions),
+                    spec,
+                    page,
+                    page_size,
+                    after,
+                )
+                page_query = page_query.add_columns(
+                    func.row_number().over(order_by=order_by).label("position")
+                ).subquery("page")
+                total_expression = (
+                    select(func.count(Product.uid)).where(*conditions).scalar_subquery()
                 )
 
-        # Подсчет общего количества товаров
-        total_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.session.execute(total_query)
-        total_count = total_result.scalar()
+            result = await self.session.execute(
+                build_page_projection_query(page_query, total_expression)
+            )
+            rows = result.all()
+            total = rows[0].total
+            rows = [row for row in rows if row.uid is not None]
+
+            logger.info("Найдено %s товаров из %s", len(rows), total)
+            return rows, total
 
-        # Сбор статистики по свойствам
-        property_stats = {}
+        except Exception as e:
+            logger.error("Ошибка при фильтрации товаров: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error filtering products: {str(e)}",
+            )
+
+    @staticmethod
+    def _use_indexes(spec: FilterSpec) -> bool:
+        """Могут ли in-memory индексы обслужить выборку."""
+        return bool(
+            spec.has_property_filters
+            and not spec.name
+            and (facet_index.ready or not spec.lists)
+            and (int_columns.ready or not spec.ranges)
+        )
+
+    @staticmethod
+    def _indexed_page(
+        spec: FilterSpec,
+        page: int,
+        page_size: int,
+        after: Optional[Tuple[Any, ...]],
+    ) -> Tuple[List[UUID], int]:
+        """
+        UUID товаров страницы по битовым картам FacetIndex и колоночному
+        индексу int-свойств.
+        """
+        bitmap = product_ordinals.alive
+        if spec.lists:
+            bitmap &= facet_index.match(spec.filters)
+        if spec.ranges:
+            bitmap &= int_columns.match(spec.int_ranges)
+        return product_ordinals.page(bitmap, spec.sort or "uid", page, page_size, after)
+
+    @staticmethod
+    def _search_conditions(spec: FilterSpec) -> List[ColumnElement[bool]]:
+        """Условия WHERE по свойствам и имени товара."""
+        # Фильтры по свойствам: по одному EXISTS на свойство или условия
+        # фиксированной формы по параметрам-массивам
+        if settings.catalog.filter_shape == "unnest":
+            conditions = build_array_filter_conditions(spec.filters, spec.int_ranges)
+        else:
+            conditions = build_filter_conditions(spec.filters, spec.int_ranges)
+
+        # Поиск по имени
+        if spec.name:
+            conditions.append(name_search.condition(spec.name))
+        return conditions
+
+    @staticmethod
+    def _paginate(
+        query: Select,
+        spec: FilterSpec,
+        page: int,
+        page_size: int,
+        after: Optional[Tuple[Any, ...]],
+    ) -> Tuple[Select, List[ColumnElement]]:
+        """
+        Сортировка и пагинация запроса по таблице products.
+
+        Returns:
+            Запрос страницы и список выражений ORDER BY.
+        """
+        # Сортировка: uid добавляется как уникальный ключ для стабильного порядка
+        rank = (
+            name_search.rank(spec.name)
+            if spec.name and spec.sort == "relevance"
+            else None
+        )
+        if rank is not None:
+            sort_key = None
+            order_by = [rank.desc(), Product.uid]
+        elif spec.sort == "name":
+            # Имена сравниваются по кодовым точкам, как в in-memory индексах
+            # (ProductOrdinals.page) и индексе ix_products_name_uid
+            name = Product.name.collate("C")
+            sort_key = tuple_(name, Product.uid)
+            order_by = [name, Product.uid]
+        else:
+            sort_key = tuple_(Product.uid)
+            order_by = [Product.uid]
+        query = query.order_by(*order_by)
+
+        # Пагинация: keyset по курсору или offset по номеру страницы
+        if after is not None and sort_key is not None:
+            query = query.where(sort_key > tuple_(*after))
+        else:
+            query = query.offset((page - 1) * page_size)
+        return query.limit(page_size), order_by
+
+    @staticmethod
+    def export_conditions(spec: FilterSpec) -> List[ColumnElement[bool]]:
+        """
+        Условия WHERE для выгрузки каталога.
+
+        Вычисляются до начала потоковой передачи; параметры проверены при
+        разборе FilterSpec, поэтому ошибка возвращается обычным ответом.
+        """
+        return ProductCRUD._search_conditions(spec)
+
+    async def export_products(
+        self,
+        conditions: List[ColumnElement[bool]],
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Потоковая выгрузка товаров пачками через серверный курсор.
+
+        Товары читаются в порядке uid по batch_size строк; свойства каждой
+        пачки загружаются двумя запросами. ORM-объекты не создаются, поэтому
+        потребление памяти не зависит от размера каталога.
+
+        Args:
+            conditions: Условия из export_conditions.
+            batch_size: Размер пачки.
 
-        # Статистика для свойств типа list
-        for prop_uid in filters.keys():
-            stats_query = (
+        Yields:
+            Список товаров пачки: {"uid", "name", "properties"}.
+        """
+        logger.info("Выгрузка каталога пачками по %s товаров", batch_size)
+        result = await self.session.stream(
+            select(Product.uid, Product.name)
+            .where(*conditions)
+            .order_by(Product.uid)
+            .execution_options(yield_per=batch_size)
+        )
+
+        exported = 0
+        async for partition in result.partitions():
+            uids = [uid for uid, _ in partition]
+            properties: Dict[UUID, List[Dict[str, Any]]] = {uid: [] for uid in uids}
+
+            values = await self.session.execute(
                 select(
+                    ProductPropertyValue.product_uid,
+                    ProductPropertyValue.property_uid,
                     ProductPropertyValue.value_uid,
-                    func.count(ProductPropertyValue.value_uid),
-                )
-                .join(Product)
-                .where(ProductPropertyValue.property_uid == prop_uid)
-                .group_by(ProductPropertyValue.value_uid)
-            )
-            stats_result = await self.session.execute(stats_query)
-            property_stats[prop_uid] = PropertyStats(
-                count=total_count,
-                values={uid: count for uid, count in stats_result.all()},
+                ).where(ProductPropertyValue.product_uid == any_(uuid_array(uids)))
             )
+            for product_uid, property_uid, value_uid in values:
+                properties[product_uid].append(
+                    {"uid": str(property_uid), "value_uid": str(value_uid)}
+                )
 
-        # Статистика для свойств типа int
-        for prop_uid in ranges.keys():
-            stats_query = (
+            ints = await self.session.execute(
                 select(
-                    func.min(ProductPropertyInt.value),
-                    func.max(ProductPropertyInt.value),
-                )
-                .join(Product)
-                .where(ProductPropertyInt.property_uid == prop_uid)
-            )
-            stats_result = await self.session.execute(stats_query)
-            min_value, max_value = stats_result.one()
-            property_stats[prop_uid] = PropertyStats(
-                count=total_count,
-                min_value=min_value,
-                max_value=max_value,
+                    ProductPropertyInt.product_uid,
+                    ProductPropertyInt.property_uid,
+                    ProductPropertyInt.value,
+                ).where(ProductPropertyInt.product_uid == any_(uuid_array(uids)))
             )
+            for product_uid, property_uid, value in ints:
+                properties[product_uid].append(
+                    {"uid": str(property_uid), "value": value}
+                )
+
+            exported += len(uids)
+            yield [
+                {"uid": str(uid), "name": name, "properties": properties[uid]}
+                for uid, name in partition
+            ]
+
+        logger.info("Выгружено %s товаров", exported)
+
+    async def get_filter_statistics(
+        self, spec: FilterSpec
+    ) -> Tuple[int, Dict[str, PropertyStats]]:
+        """
+        Получение дизъюнктивной статистики по фильтрам одним запросом.
+
+        Для каждого свойства учитываются все активные фильтры, кроме фильтра
+        по самому этому свойству.
+
+        Args:
+            spec: Фильтры по свойствам (поиск по имени не учитывается).
+
+        Returns:
+            total: Количество товаров, подходящих под все фильтры.
+            property_stats: Словарь с статистикой по всем свойствам.
+        """
+        logger.info("Статистика фильтров с параметрами: %s", spec.key)
+
+        if statistics_available():
+            # Статистика по in-memory индексам, без запросов к БД
+            result = compute_statistics(spec.filters, spec.int_ranges)
+        else:
+            # Без фильтров статистика читается из материализованных счетчиков
+            if spec.filters or spec.int_ranges:
+                statement = build_facet_statistics_query(spec.filters, spec.int_ranges)
+            else:
+                statement = build_facet_counts_query()
+            result = await self.session.execute(statement)
+
+        total_count = 0
+        property_stats = {}
+        for kind, property_uid, value_uid, count, min_value, max_value in result:
+            if kind == "total":
+                total_count = count
+                continue
+
+            key = f"{PROPERTY_KEY_PREFIX}{property_uid}"
+            if kind == "list":
+                stats = property_stats.setdefault(
+                    key, PropertyStats(count=0, values={})
+                )
+                stats.count += count
+                stats.values[str(value_uid)] = count
+            else:
+                property_stats[key] = PropertyStats(
+                    count=count, min_value=min_value, max_value=max_value
+                )
 
-        return property_stats
+        return total_count, property_stats
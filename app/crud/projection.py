@@ -0,0 +1,120 @@
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Subquery,
+    Text,
+    cast,
+    func,
+    literal_column,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from models.product_model import ProductPropertyInt, ProductPropertyValue
+from models.properties_model import PropertyValue
+
+EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def json_object(**fields: ColumnElement) -> ColumnElement:
+    """
+    json_build_object с ключами-литералами.
+
+    Ключи встраиваются в текст запроса: параметры в json_build_object
+    не получают тип при подготовке запроса в asyncpg.
+    """
+    arguments = []
+    for key, value in fields.items():
+        arguments.extend((literal_column(f"'{key}'"), value))
+    return func.json_build_object(*arguments)
+
+
+def product_json(page: Subquery) -> ColumnElement[str]:
+    """
+    JSON товара страницы, собранный в БД.
+
+    Структура совпадает с сериализацией ORM-объекта Product в GET /catalog/:
+    uid, name, property_ints и property_values (со вложенным value).
+    """
+    property_ints = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        json_object(
+                            property_uid=ProductPropertyInt.property_uid,
+                            value=ProductPropertyInt.value,
+                            product_uid=ProductPropertyInt.product_uid,
+                        ),
+                        ProductPropertyInt.property_uid,
+                    )
+                ),
+                EMPTY_JSON_ARRAY,
+            )
+        )
+        .where(ProductPropertyInt.product_uid == page.c.uid)
+        .scalar_subquery()
+    )
+
+    property_values = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        json_object(
+                            property_uid=ProductPropertyValue.property_uid,
+                            value_uid=ProductPropertyValue.value_uid,
+                            product_uid=ProductPropertyValue.product_uid,
+                            value=json_object(
+                                property_uid=PropertyValue.property_uid,
+                                value=PropertyValue.value,
+                                uid=PropertyValue.uid,
+                            ),
+                        ),
+                        ProductPropertyValue.property_uid,
+                    )
+                ),
+                EMPTY_JSON_ARRAY,
+            )
+        )
+        .join(PropertyValue, PropertyValue.uid == ProductPropertyValue.value_uid)
+        .where(ProductPropertyValue.product_uid == page.c.uid)
+        .scalar_subquery()
+    )
+
+    return cast(
+        json_object(
+            uid=page.c.uid,
+            name=page.c.name,
+            property_ints=property_ints,
+            property_values=property_values,
+        ),
+        Text,
+    )
+
+
+def build_page_projection_query(page: Subquery, total: ColumnElement[int]) -> Select:
+    """
+    Страница каталога одним запросом.
+
+    Строки результата: (total, uid, name, product), где product - JSON
+    товара в виде текста, а порядок задается колонкой page.c.position.
+    Страница присоединяется через LEFT JOIN к строке с total, поэтому
+    для пустой страницы возвращается одна строка с uid = NULL.
+
+    Args:
+        page: Подзапрос страницы с колонками uid, name и position.
+        total: Выражение общего количества подходящих товаров.
+    """
+    totals = select(total.label("total")).subquery("totals")
+    return (
+        select(
+            totals.c.total,
+            page.c.uid,
+            page.c.name,
+            product_json(page).label("product"),
+        )
+        .select_from(totals.outerjoin(page, true()))
+        .order_by(page.c.position)
+    )
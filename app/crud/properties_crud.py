@@ -5,6 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import sqlalchemy as sa
 from sqlalchemy.orm import selectinload
 
+from core.cache import catalog_generation
+from crud.facet_counts_crud import FacetCountCRUD
+from indexes.facet_index import facet_index
+from indexes.int_columns import int_columns
+from indexes.property_cache import property_cache
 from models.properties_model import Property, PropertyValue
 from fastapi import HTTPException, status
 
@@ -21,7 +26,7 @@ class PropertyCRUD:
     ) -> Property:
         """Создание нового свойства"""
 
-        logger.info(f"Создание записи Property с данными: {property_data}")
+        logger.info("Создание записи Property с данными: %s", property_data)
 
         try:
             if property_data["type"] == "list" and not values:
@@ -40,16 +45,21 @@ class PropertyCRUD:
                 ]
 
             self.session.add(db_property)
+            await FacetCountCRUD(self.session).bump_generation()
             await self.session.commit()
             await self.session.refresh(db_property)
-            logger.info(f"Успешно создана запись с ID: {db_property.uid}")
+            catalog_generation.bump()
+            # Снимок перечитывается сразу, а не при следующем чтении каталога
+            property_cache.invalidate()
+            await property_cache.ensure_loaded(self.session)
+            logger.info("Успешно создана запись с ID: %s", db_property.uid)
             return db_property
 
         except ValueError as e:
-            logger.error(f"Ошибка создания записи {str(e)}")
+            logger.error("Ошибка создания записи %s", e)
             raise HTTPException(status_code=422, detail=str(e))
         except Exception as e:
-            logger.error(f"Ошибка создания записи {str(e)}")
+            logger.error("Ошибка создания записи %s", e)
             await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -60,9 +70,9 @@ class PropertyCRUD:
         """Получение свойства по UUID"""
         stmt = sa.select(Property).where(Property.uid == uid)
         result = await self.session.scalar(stmt)
-        logger.info(f"Получение свойства: {uid}")
+        logger.info("Получение свойства: %s", uid)
         if not result:
-            logger.error(f"Cвойство: {uid} не найдено")
+            logger.error("Cвойство: %s не найдено", uid)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
             )
@@ -70,16 +80,22 @@ class PropertyCRUD:
 
     async def delete_property(self, uid: UUID) -> None:
         """Удаление свойства"""
-        logger.info(f"Удаление свойства: {uid}")
+        logger.info("Удаление свойства: %s", uid)
+        await FacetCountCRUD(self.session).remove_property(uid)
         stmt = sa.delete(Property).where(Property.uid == uid)
         result = await self.session.execute(stmt)
-        logger.info(f"Свойство: {uid} успешно удалено")
+        logger.info("Свойство: %s успешно удалено", uid)
         if result.rowcount == 0:
-            logger.error(f"Cвойство: {uid} не найдено")
+            logger.error("Cвойство: %s не найдено", uid)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Property not found"
             )
         await self.session.commit()
+        facet_index.remove_property(uid)
+        int_columns.remove_property(uid)
+        catalog_generation.bump()
+        property_cache.invalidate()
+        await property_cache.ensure_loaded(self.session)
 
     async def get_all_properties(self) -> Sequence[Property]:
         """Получение всех свойств с их значениями (для типа 'list')"""
@@ -1,5 +1,13 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import math
+import time
+from typing import AsyncGenerator, List, Optional, Sequence
 
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
@@ -8,6 +16,39 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from core.config import settings
+from core.metrics import instrument_engine, instrumented_pool_class
+from database import query_budget
+from database.slow_queries import slow_query_log
+from database.statement_stats import statement_cache_stats
+
+logger = logging.getLogger(__name__)
+
+# Cookie с моментом (unix time), до которого чтения клиента идут в primary
+PRIMARY_COOKIE = "db_primary_until"
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=engine,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
+
+def replica_name(url: str) -> str:
+    """Имя реплики для логов и метрик: URL без пароля."""
+    return make_url(url).render_as_string(hide_password=True)
+
+
+class Replica:
+    """Реплика для чтения: движок, фабрика сессий и результат проверки."""
+
+    def __init__(self, url: str, engine: AsyncEngine) -> None:
+        self.name = replica_name(url)
+        self.engine = engine
+        self.session_factory = create_session_factory(engine)
+        self.healthy = True
 
 
 class DatabaseHelper:
@@ -18,28 +59,139 @@ class DatabaseHelper:
         echo_pool: bool = False,
         pool_size: int = 5,
         max_overflow: int = 10,
+        query_cache_size: int = 500,
+        prepared_statement_cache_size: int = 100,
+        replica_urls: Sequence[str] = (),
+        health_check_interval: float = 5.0,
+        health_check_timeout: float = 2.0,
+        sticky_window: float = 5.0,
     ) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            url=url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-        )
-        self.session_factory: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self.engine,
-            autoflush=False,
-            autocommit=False,
-            expire_on_commit=False,
+        def create_engine(engine_url: str, name: str) -> AsyncEngine:
+            pool_options = {}
+            if settings.metrics.enabled:
+                pool_options["poolclass"] = instrumented_pool_class(name)
+            engine = create_async_engine(
+                url=engine_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                query_cache_size=query_cache_size,
+                connect_args={
+                    "prepared_statement_cache_size": prepared_statement_cache_size
+                },
+                **pool_options,
+            )
+            statement_cache_stats.instrument(engine)
+            query_budget.instrument(engine)
+            if settings.metrics.enabled:
+                instrument_engine(engine, name, pool_size + max_overflow)
+            if settings.slow_query.enabled:
+                slow_query_log.instrument(engine, name)
+            return engine
+
+        self.engine: AsyncEngine = create_engine(url, "primary")
+        self.session_factory: async_sessionmaker[AsyncSession] = create_session_factory(
+            self.engine
         )
+        self.replicas: List[Replica] = [
+            Replica(replica_url, create_engine(replica_url, replica_name(replica_url)))
+            for replica_url in replica_urls
+        ]
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.sticky_window = sticky_window
+        self._round_robin = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
 
     async def dispose(self) -> None:
+        await self.stop_health_checks()
         await self.engine.dispose()
+        for replica in self.replicas:
+            await replica.engine.dispose()
 
     async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
+    def is_sticky(self, request: Request) -> bool:
+        """Была ли у клиента запись в течение окна read-your-writes."""
+        try:
+            primary_until = float(request.cookies.get(PRIMARY_COOKIE, 0))
+        except ValueError:
+            return False
+        return primary_until > time.time()
+
+    def mark_write(self, response: Response) -> None:
+        """Привязка чтений клиента к primary на sticky_window секунд."""
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            f"{time.time() + self.sticky_window:.3f}",
+            max_age=math.ceil(self.sticky_window),
+            httponly=True,
+            samesite="lax",
+        )
+
+    def read_session_factory(
+        self, request: Optional[Request] = None
+    ) -> async_sessionmaker[AsyncSession]:
+        """
+        Фабрика сессий для запросов только на чтение.
+
+        Реплики выбираются по кругу среди прошедших проверку. Клиент, недавно
+        выполнивший запись, а также все клиенты при отсутствии доступных
+        реплик читают из primary.
+        """
+        if request is not None and self.is_sticky(request):
+            return self.session_factory
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return self.session_factory
+        return healthy[next(self._round_robin) % len(healthy)].session_factory
+
+    async def read_session_getter(
+        self, request: Request
+    ) -> AsyncGenerator[AsyncSession, None]:
+        async with self.read_session_factory(request)() as session:
+            yield session
+
+    async def check_replica(self, replica: Replica) -> None:
+        """Проверка реплики запросом SELECT 1."""
+        try:
+            async with asyncio.timeout(self.health_check_timeout):
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except Exception as e:
+            if replica.healthy:
+                logger.warning("Реплика %s недоступна: %s", replica.name, e)
+            replica.healthy = False
+        else:
+            if not replica.healthy:
+                logger.info("Реплика %s снова доступна", replica.name)
+            replica.healthy = True
+
+    async def run_health_checks(self) -> None:
+        while True:
+            await asyncio.gather(
+                *(self.check_replica(replica) for replica in self.replicas)
+            )
+            await asyncio.sleep(self.health_check_interval)
+
+    def start_health_checks(self) -> None:
+        """Запуск фоновой проверки реплик."""
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self.run_health_checks())
+
+    async def stop_health_checks(self) -> None:
+        if self._health_task is None:
+            return
+        self._health_task.cancel()
+        try:
+            await self._health_task
+        except asyncio.CancelledError:
+            pass
+        self._health_task = None
+
 
 db_helper = DatabaseHelper(
     url=str(settings.db.url),
@@ -47,4 +199,10 @@ db_helper = DatabaseHelper(
     echo_pool=settings.db.echo_pool,
     pool_size=settings.db.pool_size,
     max_overflow=settings.db.max_overflow,
+    query_cache_size=settings.db.query_cache_size,
+    prepared_statement_cache_size=settings.db.prepared_statement_cache_size,
+    replica_urls=[str(replica_url) for replica_url in settings.db.replica_urls],
+    health_check_interval=settings.db.replica_health_interval,
+    health_check_timeout=settings.db.replica_health_timeout,
+    sticky_window=settings.db.read_your_writes_window,
 )
@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.request_context import current_scope
+
+# Атрибут обработчика маршрута с бюджетом запросов
+BUDGET_ATTRIBUTE = "query_budget"
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def query_budget(max_queries: int) -> Callable[[Endpoint], Endpoint]:
+    """
+    Объявление бюджета SQL-запросов маршрута.
+
+    Бюджет - предельное число запросов к БД на один HTTP-запрос, не
+    зависящее от размера входных данных (числа фильтров, свойств товара,
+    UUID в запросе). Обработчик не оборачивается, поэтому декоратор
+    ставится под декоратором роутера:
+
+        @router.get("/product/{product_uid}")
+        @query_budget(3)
+        async def get_product(...): ...
+    """
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, BUDGET_ATTRIBUTE, max_queries)
+        return endpoint
+
+    return decorator
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Маршрут выполнил больше запросов, чем объявлено в его бюджете."""
+
+
+class QueryCounter:
+    """SQL-запросы, выполненные внутри count_queries()."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        # Маршрут HTTP-запроса, выполнившего запросы (из scope роутера)
+        self.route = None
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def route_path(self) -> Optional[str]:
+        return self.route.path if self.route is not None else None
+
+    @property
+    def budget(self) -> Optional[int]:
+        """Бюджет маршрута или None, если маршрут его не объявил."""
+        if self.route is None:
+            return None
+        return getattr(self.route.endpoint, BUDGET_ATTRIBUTE, None)
+
+    def check(self, budget: Optional[int] = None) -> None:
+        """
+        Проверка числа запросов.
+
+        Args:
+            budget: Предельное число запросов; по умолчанию - бюджет маршрута.
+
+        Raises:
+            QueryBudgetExceeded: Если запросов больше бюджета или запросы
+                выполнил маршрут без объявленного бюджета.
+        """
+        if budget is None:
+            budget = self.budget
+        if budget is None:
+            if self.route is not None:
+                raise QueryBudgetExceeded(
+                    f"{self.route_path}: {self.count} запросов к БД, "
+                    f"бюджет не объявлен"
+                )
+            return
+        if self.count > budget:
+            statements = "\n".join(
+                f"  {number}. {' '.join(statement.split())[:300]}"
+                for number, statement in enumerate(self.statements, 1)
+            )
+            raise QueryBudgetExceeded(
+                f"{self.route_path or 'вне маршрута'}: {self.count} запросов к БД "
+                f"при бюджете {budget}:\n{statements}"
+            )
+
+
+current_counter: ContextVar[Optional[QueryCounter]] = ContextVar(
+    "current_query_counter", default=None
+)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """
+    Подсчет SQL-запросов движков db_helper в текущем контексте.
+
+    Контекст наследуется задачами и ASGI-приложением, вызванным из него
+    (например, через httpx.ASGITransport):
+
+        with count_queries() as counter:
+            await client.get(f"/product/{uid}")
+        counter.check()
+    """
+    counter = QueryCounter()
+    token = current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        current_counter.reset(token)
+
+
+def instrument(engine: AsyncEngine) -> None:
+    """Подписка счетчика на выполнение запросов движка."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        counter = current_counter.get()
+        if counter is None:
+            return
+        counter.statements.append(statement)
+        scope = current_scope.get()
+        if scope is not None and scope.get("route") is not None:
+            counter.route = scope["route"]
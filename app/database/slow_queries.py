@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+from core.request_context import current_route
+
+logger = logging.getLogger(__name__)
+
+# Опция выполнения, исключающая запрос из журнала (сам EXPLAIN)
+SKIP_OPTION = "skip_slow_query_log"
+# Максимальная длина параметра в журнале
+MAX_PARAMETER_LENGTH = 200
+QUOTED_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def normalize_sql(statement: str) -> str:
+    """Текст запроса в одну строку: значения уже вынесены в параметры."""
+    return " ".join(statement.split())
+
+
+def redact_literals(plan: str) -> str:
+    """Замена строковых литералов плана ('...', с экранированием '') на '?'."""
+    return QUOTED_LITERAL.sub("'?'", plan)
+
+
+def format_parameters(parameters: Any) -> List[str]:
+    if parameters is None:
+        return []
+    if isinstance(parameters, dict):
+        parameters = parameters.values()
+    formatted = []
+    for value in parameters:
+        text = repr(value)
+        if len(text) > MAX_PARAMETER_LENGTH:
+            text = text[:MAX_PARAMETER_LENGTH] + "..."
+        formatted.append(text)
+    return formatted
+
+
+class SlowQueryLog:
+    """
+    Журнал медленных запросов.
+
+    Запросы дольше threshold секунд попадают в кольцевой буфер entries с
+    нормализованным текстом, маршрутом, который их выполнил, и параметрами
+    (только при log_parameters, иначе вместо значений - их количество).
+    Для доли explain_sample_rate медленных SELECT в фоне выполняется
+    EXPLAIN (ANALYZE, BUFFERS) на том же движке; планы хранятся в
+    отдельном кольцевом буфере plans. EXPLAIN ANALYZE повторно выполняет
+    запрос, поэтому одновременно выполняется не больше одного и только
+    для SELECT. Без log_parameters строковые литералы в тексте плана
+    (строки, UUID, массивы из параметров) заменяются на '?'.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        explain_sample_rate: float = 0.1,
+        max_entries: int = 200,
+        max_plans: int = 20,
+        log_parameters: bool = False,
+    ) -> None:
+        self.threshold = threshold
+        self.log_parameters = log_parameters
+        self.explain_sample_rate = explain_sample_rate
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=max_entries)
+        self.plans: Deque[Dict[str, Any]] = deque(maxlen=max_plans)
+        self._explaining = False
+        self._tasks: set = set()
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.plans.clear()
+
+    def instrument(self, engine: AsyncEngine, name: str) -> None:
+        """Подписка на выполнение запросов движка."""
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+            conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+            elapsed = time.perf_counter() - conn.info["slow_query_started"].pop()
+            if elapsed < self.threshold:
+                return
+            if context is not None and context.execution_options.get(SKIP_OPTION):
+                return
+            self.record(engine, name, statement, parameters, elapsed, many)
+
+        @event.listens_for(engine.sync_engine, "handle_error")
+        def handle_error(context):
+            if context.connection is not None:
+                started = context.connection.info.get("slow_query_started")
+                if started:
+                    started.pop()
+
+    def record(
+        self,
+        engine: AsyncEngine,
+        pool: str,
+        statement: str,
+        parameters: Any,
+        elapsed: float,
+        executemany: bool,
+    ) -> None:
+        sql = normalize_sql(statement)
+        route = current_route()
+        entry = {
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "duration": round(elapsed, 6),
+            "route": route,
+            "pool": pool,
+            "statement": sql,
+        }
+        if self.log_parameters:
+            entry["parameters"] = [] if executemany else format_parameters(parameters)
+        else:
+            entry["parameters_count"] = (
+                0 if executemany or parameters is None else len(parameters)
+            )
+        self.entries.append(entry)
+        logger.warning(
+            "Медленный запрос (%.3f с, %s): %s",
+            elapsed,
+            route or "вне запроса",
+            sql[:500],
+        )
+
+        if (
+            not executemany
+            and not self._explaining
+            and sql[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample_rate
+        ):
+            self._explaining = True
+            # Обработчик выполняется в потоке цикла событий приложения
+            task = asyncio.get_running_loop().create_task(
+                self.explain(engine, statement, parameters, entry)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def explain(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        entry: Dict[str, Any],
+    ) -> None:
+        """Фоновый EXPLAIN (ANALYZE, BUFFERS) медленного запроса."""
+        try:
+            async with engine.connect() as connection:
+                connection = await connection.execution_options(**{SKIP_OPTION: True})
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in result)
+                if not self.log_parameters:
+                    plan = redact_literals(plan)
+                # Транзакция откатывается при закрытии соединения
+            self.plans.append({**entry, "plan": plan})
+        except Exception as e:
+            logger.error("Ошибка при получении плана медленного запроса: %s", e)
+        finally:
+            self._explaining = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "explain_sample_rate": self.explain_sample_rate,
+            "log_parameters": self.log_parameters,
+            "entries": list(self.entries),
+            "plans": list(self.plans),
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold=settings.slow_query.threshold,
+    explain_sample_rate=settings.slow_query.explain_sample_rate,
+    max_entries=settings.slow_query.max_entries,
+    max_plans=settings.slow_query.max_plans,
+    log_parameters=settings.slow_query.log_parameters,
+)
@@ -0,0 +1,80 @@
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+def hit_rate(hits: int, misses: int) -> Optional[float]:
+    total = hits + misses
+    return round(hits / total, 4) if total else None
+
+
+class StatementCacheStats:
+    """
+    Счетчики попаданий в кэши запросов.
+
+    compile - кэш скомпилированных запросов SQLAlchemy (context.cache_hit),
+    prepare - кэш подготовленных запросов asyncpg на соединении. Попадание
+    в prepare определяется до выполнения по наличию текста запроса в кэше
+    соединения; для других драйверов счетчики prepare не растут.
+    """
+
+    def __init__(self) -> None:
+        self.compile_hits = 0
+        self.compile_misses = 0
+        self.compile_uncached = 0
+        self.prepare_hits = 0
+        self.prepare_misses = 0
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Подписка на выполнение запросов движка."""
+        event.listen(
+            engine.sync_engine, "before_cursor_execute", self._before_cursor_execute
+        )
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if context is not None:
+            cache_hit = context.cache_hit
+            if cache_hit == Dialect.CACHE_HIT:
+                self.compile_hits += 1
+            elif cache_hit == Dialect.CACHE_MISS:
+                self.compile_misses += 1
+            else:
+                self.compile_uncached += 1
+
+        # executemany в asyncpg выполняется без кэша подготовленных запросов
+        if executemany:
+            return
+        prepared = getattr(
+            conn.connection.dbapi_connection, "_prepared_statement_cache", None
+        )
+        if prepared is None:
+            return
+        if statement in prepared:
+            self.prepare_hits += 1
+        else:
+            self.prepare_misses += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {
+            "compile": {
+                "hits": self.compile_hits,
+                "misses": self.compile_misses,
+                "uncached": self.compile_uncached,
+                "hit_rate": hit_rate(self.compile_hits, self.compile_misses),
+            },
+            "prepare": {
+                "hits": self.prepare_hits,
+                "misses": self.prepare_misses,
+                "hit_rate": hit_rate(self.prepare_hits, self.prepare_misses),
+            },
+        }
+
+
+statement_cache_stats = StatementCacheStats()
@@ -0,0 +1,141 @@
+import logging
+import sys
+from array import array
+from typing import Any, Callable, Iterable, Iterator, Union
+
+try:
+    from pyroaring import FrozenBitMap
+except ImportError:  # pyroaring - необязательная зависимость
+    FrozenBitMap = None
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# int (несжатая карта) или pyroaring.FrozenBitMap
+Bitmap = Any
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """Перебор номеров установленных битов целого числа по возрастанию."""
+    # Карта разбирается на 64-битные слова: память - size / 8 байт, а не
+    # строка bin() длиной size
+    words = array("Q", bitmap.to_bytes(-(-bitmap.bit_length() // 64) * 8, "little"))
+    if sys.byteorder == "big":
+        words.byteswap()
+    for index, word in enumerate(words):
+        base = index << 6
+        while word:
+            lowest = word & -word
+            yield base + lowest.bit_length() - 1
+            word ^= lowest
+
+
+class IntBitmaps:
+    """
+    Несжатые битовые карты: Python int, бит i - товар с номером i.
+
+    Занимают size / 8 байт на карту независимо от числа товаров в ней.
+    """
+
+    name = "int"
+
+    def empty(self) -> int:
+        return 0
+
+    def full(self, size: int) -> int:
+        return (1 << size) - 1
+
+    def from_ordinals(self, ordinals: Iterable[int], size: int) -> int:
+        """Построение карты из набора номеров за один проход."""
+        buffer = bytearray((size + 7) // 8)
+        for ordinal in ordinals:
+            buffer[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(buffer, "little")
+
+    def add(self, bitmap: int, ordinal: int) -> int:
+        return bitmap | (1 << ordinal)
+
+    def remove(self, bitmap: int, ordinal: int) -> int:
+        return bitmap & ~(1 << ordinal)
+
+    def count(self, bitmap: int) -> int:
+        return bitmap.bit_count()
+
+    def iterate(self, bitmap: int) -> Iterator[int]:
+        return iter_bits(bitmap)
+
+    def membership(self, bitmap: int, size: int) -> Callable[[int], bool]:
+        """Проверка номера за O(1): карта один раз переводится в байты."""
+        data = bitmap.to_bytes((size + 7) // 8, "little")
+        return lambda ordinal: data[ordinal >> 3] >> (ordinal & 7) & 1
+
+    def to_mask(self, bitmap: int, size: int) -> "np.ndarray":
+        """Карта -> булев массив длины size."""
+        raw = bitmap.to_bytes((size + 7) // 8, "little")
+        bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")
+        return bits[:size].astype(bool)
+
+    def from_mask(self, mask: "np.ndarray") -> int:
+        """Булев массив -> карта."""
+        return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+class RoaringBitmaps:
+    """
+    Сжатые битовые карты Roaring (pyroaring.FrozenBitMap).
+
+    Размер карты зависит от числа и распределения товаров в ней, а не от
+    размера каталога. Карты неизменяемы, как и int: операции возвращают
+    новую карту, поэтому общие карты индексов нельзя испортить на месте.
+    """
+
+    name = "roaring"
+
+    def empty(self) -> "FrozenBitMap":
+        return FrozenBitMap()
+
+    def full(self, size: int) -> "FrozenBitMap":
+        return FrozenBitMap(range(size))
+
+    def from_ordinals(self, ordinals: Iterable[int], size: int) -> "FrozenBitMap":
+        return FrozenBitMap(ordinals)
+
+    def add(self, bitmap: "FrozenBitMap", ordinal: int) -> "FrozenBitMap":
+        return bitmap | FrozenBitMap((ordinal,))
+
+    def remove(self, bitmap: "FrozenBitMap", ordinal: int) -> "FrozenBitMap":
+        return bitmap - FrozenBitMap((ordinal,))
+
+    def count(self, bitmap: "FrozenBitMap") -> int:
+        return len(bitmap)
+
+    def iterate(self, bitmap: "FrozenBitMap") -> Iterator[int]:
+        return iter(bitmap)
+
+    def membership(self, bitmap: "FrozenBitMap", size: int) -> Callable[[int], bool]:
+        return bitmap.__contains__
+
+    def to_mask(self, bitmap: "FrozenBitMap", size: int) -> "np.ndarray":
+        mask = np.zeros(size, dtype=bool)
+        mask[np.frombuffer(bitmap.to_array(), dtype=np.uint32)] = True
+        return mask
+
+    def from_mask(self, mask: "np.ndarray") -> "FrozenBitMap":
+        ordinals = array("I")
+        ordinals.frombytes(np.flatnonzero(mask).astype(np.uint32).tobytes())
+        return FrozenBitMap(ordinals)
+
+
+def create_bitmaps() -> Union[IntBitmaps, RoaringBitmaps]:
+    """Сжатые карты, если установлен pyroaring, иначе несжатые."""
+    if FrozenBitMap is None:
+        logger.info("pyroaring не установлен, битовые карты индексов не сжимаются")
+        return IntBitmaps()
+    return RoaringBitmaps()
+
+
+bitmaps = create_bitmaps()
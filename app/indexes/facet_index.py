@@ -0,0 +1,114 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from indexes.bitmaps import Bitmap, bitmaps
+from indexes.ordinals import ProductOrdinals, product_ordinals
+from models.product_model import ProductPropertyValue
+
+logger = logging.getLogger(__name__)
+
+
+class FacetIndex:
+    """
+    In-memory индекс list-свойств товаров.
+
+    Для каждой пары (property_uid, value_uid) хранится битовая карта
+    порядковых номеров товаров. Индекс опционален: он строится при старте
+    приложения, обновляется write-путями ProductCRUD текущего процесса и
+    периодически перестраивается из БД (IndexRebuilder).
+    """
+
+    def __init__(self, ordinals: ProductOrdinals) -> None:
+        self.ordinals = ordinals
+        self.bitmaps: Dict[Tuple[UUID, UUID], Bitmap] = {}
+        self.ready = False
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Полное построение индекса по данным из БД.
+
+        Порядковые номера товаров должны быть загружены заранее.
+        """
+        logger.info("Построение индекса list-свойств...")
+        values = await session.execute(
+            select(
+                ProductPropertyValue.product_uid,
+                ProductPropertyValue.property_uid,
+                ProductPropertyValue.value_uid,
+            )
+        )
+        positions = self.ordinals.positions
+        ordinals_by_key: Dict[Tuple[UUID, UUID], List[int]] = defaultdict(list)
+        for product_uid, property_uid, value_uid in values:
+            ordinal = positions.get(product_uid)
+            if ordinal is not None:
+                ordinals_by_key[(property_uid, value_uid)].append(ordinal)
+
+        size = len(self.ordinals)
+        self.bitmaps = {
+            key: bitmaps.from_ordinals(ordinals, size)
+            for key, ordinals in ordinals_by_key.items()
+        }
+        self.ready = True
+        logger.info(
+            "Индекс list-свойств построен: %s товаров, %s значений",
+            size,
+            len(self.bitmaps),
+        )
+
+    def replace(self, other: "FacetIndex") -> None:
+        """Подмена битовых карт на карты другого экземпляра (после перестроения)."""
+        self.bitmaps = other.bitmaps
+        self.ready = other.ready
+
+    def add_product(
+        self, uid: UUID, name: str, values: Iterable[Tuple[UUID, UUID]]
+    ) -> None:
+        """Добавление товара и его пар (property_uid, value_uid)."""
+        if not self.ready:
+            return
+        ordinal = self.ordinals.add(uid, name)
+        for key in values:
+            self.bitmaps[key] = bitmaps.add(
+                self.bitmaps.get(key, bitmaps.empty()), ordinal
+            )
+
+    def remove_product(self, uid: UUID) -> None:
+        """Исключение товара из индекса."""
+        if not self.ready:
+            return
+        self.ordinals.remove(uid)
+
+    def remove_property(self, property_uid: UUID) -> None:
+        """Удаление битовых карт значений удаленного свойства."""
+        self.bitmaps = {
+            key: bitmap
+            for key, bitmap in self.bitmaps.items()
+            if key[0] != property_uid
+        }
+
+    def match(self, filters: Dict[UUID, List[UUID]]) -> Bitmap:
+        """
+        Битовая карта товаров, подходящих под фильтры.
+
+        Значения одного свойства объединяются через OR, свойства между
+        собой - через AND.
+        """
+        empty = bitmaps.empty()
+        result = self.ordinals.alive
+        for property_uid, value_uids in filters.items():
+            matched = empty
+            for value_uid in value_uids:
+                matched |= self.bitmaps.get((property_uid, value_uid), empty)
+            result &= matched
+            if not result:
+                break
+        return result
+
+
+facet_index = FacetIndex(product_ordinals)
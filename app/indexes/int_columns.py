@@ -0,0 +1,158 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from indexes.bitmaps import Bitmap, bitmaps
+from indexes.ordinals import ProductOrdinals, product_ordinals
+from models.product_model import ProductPropertyInt
+
+try:
+    import numpy as np
+except ImportError:  # NumPy - необязательная зависимость
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class IntColumnIndex:
+    """
+    Колоночный in-memory снимок int-свойств товаров.
+
+    Для каждого свойства хранятся массивы NumPy порядковых номеров товаров
+    и значений. Диапазонные фильтры и min/max считаются векторно;
+    добавленные строки копятся в списке и сливаются в массивы при
+    следующем чтении. Удаленные товары отсекаются битовой картой alive.
+    """
+
+    def __init__(self, ordinals: ProductOrdinals) -> None:
+        self.ordinals = ordinals
+        self.columns: Dict[UUID, Tuple["np.ndarray", "np.ndarray"]] = {}
+        self.pending: Dict[UUID, List[Tuple[int, int]]] = {}
+        self.ready = False
+
+    async def load(self, session: AsyncSession) -> None:
+        """
+        Полное построение снимка по данным из БД.
+
+        Порядковые номера товаров должны быть загружены заранее.
+        """
+        if np is None:
+            logger.warning("NumPy не установлен, колоночный индекс отключен")
+            return
+
+        logger.info("Построение колоночного индекса int-свойств...")
+        result = await session.execute(
+            select(
+                ProductPropertyInt.property_uid,
+                ProductPropertyInt.product_uid,
+                ProductPropertyInt.value,
+            )
+        )
+        positions = self.ordinals.positions
+        rows: Dict[UUID, List[Tuple[int, int]]] = {}
+        for property_uid, product_uid, value in result:
+            ordinal = positions.get(product_uid)
+            if ordinal is not None:
+                rows.setdefault(property_uid, []).append((ordinal, value))
+
+        self.columns = {
+            property_uid: self._to_arrays(property_rows)
+            for property_uid, property_rows in rows.items()
+        }
+        self.pending = {}
+        self.ready = True
+        logger.info("Колоночный индекс int-свойств построен: %s свойств", len(rows))
+
+    @staticmethod
+    def _to_arrays(rows: List[Tuple[int, int]]) -> Tuple["np.ndarray", "np.ndarray"]:
+        data = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        return data[:, 0].copy(), data[:, 1].copy()
+
+    def _column(
+        self, property_uid: UUID
+    ) -> Optional[Tuple["np.ndarray", "np.ndarray"]]:
+        pending = self.pending.pop(property_uid, None)
+        if pending:
+            ordinals, values = self._to_arrays(pending)
+            if property_uid in self.columns:
+                old_ordinals, old_values = self.columns[property_uid]
+                ordinals = np.concatenate((old_ordinals, ordinals))
+                values = np.concatenate((old_values, values))
+            self.columns[property_uid] = (ordinals, values)
+        return self.columns.get(property_uid)
+
+    def replace(self, other: "IntColumnIndex") -> None:
+        """Подмена массивов на массивы другого экземпляра (после перестроения)."""
+        self.columns = other.columns
+        self.pending = other.pending
+        self.ready = other.ready
+
+    def add_product(
+        self, uid: UUID, name: str, values: Iterable[Tuple[UUID, int]]
+    ) -> None:
+        """Добавление товара и его пар (property_uid, value)."""
+        if not self.ready:
+            return
+        ordinal = self.ordinals.add(uid, name)
+        for property_uid, value in values:
+            self.pending.setdefault(property_uid, []).append((ordinal, value))
+
+    def remove_product(self, uid: UUID) -> None:
+        """Исключение товара из индекса."""
+        if not self.ready:
+            return
+        self.ordinals.remove(uid)
+
+    def remove_property(self, property_uid: UUID) -> None:
+        """Удаление колонки удаленного свойства."""
+        self.columns = {
+            uid: column for uid, column in self.columns.items() if uid != property_uid
+        }
+        self.pending.pop(property_uid, None)
+
+    def property_uids(self) -> List[UUID]:
+        """UUID всех int-свойств в снимке."""
+        return list(self.columns.keys() | self.pending.keys())
+
+    def match(self, ranges: Dict[UUID, Dict[str, int]]) -> Bitmap:
+        """Битовая карта товаров, значения которых попадают во все диапазоны."""
+        size = len(self.ordinals)
+        result = bitmaps.to_mask(self.ordinals.alive, size)
+        for property_uid, range_values in ranges.items():
+            column = self._column(property_uid)
+            matched = np.zeros(size, dtype=bool)
+            if column is not None:
+                ordinals, values = column
+                selected = np.ones(len(values), dtype=bool)
+                if "from" in range_values:
+                    selected &= values >= range_values["from"]
+                if "to" in range_values:
+                    selected &= values <= range_values["to"]
+                matched[ordinals[selected]] = True
+            result &= matched
+        return bitmaps.from_mask(result)
+
+    def bounds(
+        self, property_uid: UUID, mask: "np.ndarray"
+    ) -> Tuple[int, Optional[int], Optional[int]]:
+        """
+        Количество товаров и min/max значения свойства среди товаров маски.
+
+        Args:
+            property_uid: UUID int-свойства.
+            mask: Булев массив товаров по порядковым номерам.
+        """
+        column = self._column(property_uid)
+        if column is None:
+            return 0, None, None
+        ordinals, values = column
+        selected = values[mask[ordinals]]
+        if not len(selected):
+            return 0, None, None
+        return len(selected), int(selected.min()), int(selected.max())
+
+
+int_columns = IntColumnIndex(product_ordinals)
@@ -0,0 +1,151 @@
+import logging
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, false, func, literal_column, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from crud.filters import UuidIn
+from models.product_model import Product
+
+logger = logging.getLogger(__name__)
+
+# Колонка из миграции полнотекстового поиска, в модели Product не описана
+NAME_TSV = literal_column("products.name_tsv", TSVECTOR)
+
+
+class NameSearchBackend:
+    """
+    Бэкенд поиска товаров по имени: ILIKE '%...%'.
+
+    Базовый класс задает интерфейс бэкендов: условие WHERE, выражение
+    релевантности для сортировки и хуки синхронизации in-process индексов.
+    """
+
+    def condition(self, name: str) -> ColumnElement[bool]:
+        """Условие WHERE для поиска по имени."""
+        return Product.name.ilike(f"%{name}%")
+
+    def rank(self, name: str) -> Optional[ColumnElement]:
+        """Выражение релевантности (больше - лучше) или None."""
+        return None
+
+    async def load(self, session: AsyncSession) -> None:
+        """Построение in-process индекса при старте приложения."""
+
+    def replace(self, other: "NameSearchBackend") -> None:
+        """Подмена in-process индекса на индекс другого экземпляра."""
+
+    def add_product(self, uid: UUID, name: str) -> None:
+        """Добавление товара в in-process индекс."""
+
+    def remove_product(self, uid: UUID) -> None:
+        """Удаление товара из in-process индекса."""
+
+
+class TrigramNameSearch(NameSearchBackend):
+    """
+    Поиск через pg_trgm.
+
+    ILIKE '%...%' обслуживается GIN-индексом ix_products_name_trgm,
+    релевантность - функцией similarity().
+    """
+
+    def rank(self, name: str) -> Optional[ColumnElement]:
+        return func.similarity(Product.name, name)
+
+
+class FullTextNameSearch(NameSearchBackend):
+    """Полнотекстовый поиск по колонке products.name_tsv (GIN-индекс)."""
+
+    def condition(self, name: str) -> ColumnElement[bool]:
+        return NAME_TSV.op("@@")(func.plainto_tsquery("simple", name))
+
+    def rank(self, name: str) -> Optional[ColumnElement]:
+        return func.ts_rank(NAME_TSV, func.plainto_tsquery("simple", name))
+
+
+class NgramNameSearch(NameSearchBackend):
+    """
+    In-process инвертированный индекс n-грамм для БД без pg_trgm.
+
+    Кандидаты находятся пересечением списков n-грамм запроса и проверяются
+    на вхождение подстроки; в SQL передается только массив UUID. Запрос
+    короче n-граммы не сужает выборку и выполняется через ILIKE.
+    """
+
+    def __init__(self, size: int = 3) -> None:
+        self.size = size
+        self.names: Dict[UUID, str] = {}
+        self.postings: Dict[str, Set[UUID]] = {}
+
+    def _ngrams(self, text: str) -> Set[str]:
+        return {text[i : i + self.size] for i in range(len(text) - self.size + 1)}
+
+    async def load(self, session: AsyncSession) -> None:
+        logger.info("Построение n-граммного индекса имен...")
+        self.names = {}
+        self.postings = {}
+        result = await session.execute(select(Product.uid, Product.name))
+        for uid, name in result:
+            self.add_product(uid, name)
+        logger.info("N-граммный индекс имен построен: %s товаров", len(self.names))
+
+    def replace(self, other: "NgramNameSearch") -> None:
+        self.names = other.names
+        self.postings = other.postings
+
+    def add_product(self, uid: UUID, name: str) -> None:
+        text = name.lower()
+        self.names[uid] = text
+        for ngram in self._ngrams(text):
+            self.postings.setdefault(ngram, set()).add(uid)
+
+    def remove_product(self, uid: UUID) -> None:
+        text = self.names.pop(uid, None)
+        if text is None:
+            return
+        for ngram in self._ngrams(text):
+            postings = self.postings.get(ngram)
+            if postings is not None:
+                postings.discard(uid)
+                if not postings:
+                    del self.postings[ngram]
+
+    def search(self, name: str) -> Set[UUID]:
+        """UUID товаров, имя которых содержит подстроку name."""
+        text = name.lower()
+        ngrams = self._ngrams(text)
+        if not ngrams:
+            candidates = self.names.keys()
+        else:
+            lists = sorted(
+                (self.postings.get(ngram, set()) for ngram in ngrams), key=len
+            )
+            candidates = set.intersection(*lists)
+        return {uid for uid in candidates if text in self.names[uid]}
+
+    def condition(self, name: str) -> ColumnElement[bool]:
+        if len(name) < self.size:
+            return super().condition(name)
+        uids = self.search(name)
+        if not uids:
+            return false()
+        # В PostgreSQL - один параметр uuid[] вместо параметра на каждый UUID
+        return UuidIn(Product.uid, sorted(uids))
+
+
+def create_name_search(backend: str) -> NameSearchBackend:
+    """Создание бэкенда поиска по имени из конфигурации."""
+    if backend == "trigram":
+        return TrigramNameSearch()
+    if backend == "fulltext":
+        return FullTextNameSearch()
+    if backend == "ngram":
+        return NgramNameSearch(settings.search.ngram_size)
+    return NameSearchBackend()
+
+
+name_search = create_name_search(settings.search.name_backend)
@@ -0,0 +1,169 @@
+import heapq
+import logging
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from indexes.bitmaps import Bitmap, bitmaps
+from models.product_model import Product
+
+logger = logging.getLogger(__name__)
+
+
+class ProductOrdinals:
+    """
+    Соответствие UUID товаров порядковым номерам битов.
+
+    Номера общие для всех in-memory индексов и не переиспользуются:
+    удаленный товар лишь снимается с битовой карты alive, поэтому данные
+    индексов не нужно переписывать. Для каждой сортировки по требованию
+    строится список номеров в порядке сортировки; новые товары вставляются
+    в него бинарным поиском.
+    """
+
+    def __init__(self) -> None:
+        self.uids: List[Optional[UUID]] = []
+        self.names: List[Optional[str]] = []
+        self.positions: Dict[UUID, int] = {}
+        self.alive: Bitmap = bitmaps.empty()
+        # Сортировка -> (ключи по возрастанию, номера товаров в том же порядке)
+        self.orders: Dict[str, Tuple[List[Tuple[Any, ...]], List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def load(self, products: Iterable[Tuple[UUID, str]]) -> None:
+        """Полная загрузка списка товаров (uid, name)."""
+        self.uids = []
+        self.names = []
+        self.positions = {}
+        for uid, name in products:
+            self.positions[uid] = len(self.uids)
+            self.uids.append(uid)
+            self.names.append(name)
+        self.alive = bitmaps.full(len(self.uids))
+        self.orders = {}
+
+    def replace(self, other: "ProductOrdinals") -> None:
+        """Подмена данных на данные другого экземпляра (после перестроения)."""
+        self.uids = other.uids
+        self.names = other.names
+        self.positions = other.positions
+        self.alive = other.alive
+        self.orders = other.orders
+
+    async def load_products(self, session: AsyncSession) -> None:
+        """Загрузка списка товаров из БД."""
+        result = await session.execute(select(Product.uid, Product.name))
+        self.load(result.all())
+        logger.info("Загружены порядковые номера %s товаров", len(self.uids))
+
+    def add(self, uid: UUID, name: str) -> int:
+        """Регистрация нового товара, возвращает его номер."""
+        ordinal = self.positions.get(uid)
+        if ordinal is None:
+            ordinal = len(self.uids)
+            self.positions[uid] = ordinal
+            self.uids.append(uid)
+            self.names.append(name)
+            for sort, (keys, ordinals) in self.orders.items():
+                key = self._key(ordinal, sort)
+                position = bisect_right(keys, key)
+                keys.insert(position, key)
+                ordinals.insert(position, ordinal)
+        self.alive = bitmaps.add(self.alive, ordinal)
+        return ordinal
+
+    def remove(self, uid: UUID) -> Optional[int]:
+        """Исключение товара из выборок, возвращает его номер."""
+        ordinal = self.positions.pop(uid, None)
+        if ordinal is not None:
+            self.alive = bitmaps.remove(self.alive, ordinal)
+            self.uids[ordinal] = None
+            self.names[ordinal] = None
+        return ordinal
+
+    def _key(self, ordinal: int, sort: str) -> Tuple[Any, ...]:
+        if sort == "name":
+            return self.names[ordinal], self.uids[ordinal]
+        return (self.uids[ordinal],)
+
+    def _order(self, sort: str) -> Tuple[List[Tuple[Any, ...]], List[int]]:
+        """Ключи и номера живых товаров в порядке сортировки."""
+        order = self.orders.get(sort)
+        if order is None:
+            entries = sorted(
+                (self._key(ordinal, sort), ordinal)
+                for ordinal in bitmaps.iterate(self.alive)
+            )
+            order = self.orders[sort] = (
+                [key for key, _ in entries],
+                [ordinal for _, ordinal in entries],
+            )
+        return order
+
+    def page(
+        self,
+        bitmap: Bitmap,
+        sort: str,
+        page: int,
+        page_size: int,
+        after: Optional[Tuple[Any, ...]] = None,
+    ) -> Tuple[List[UUID], int]:
+        """
+        Выбор одной страницы товаров из битовой карты.
+
+        Порядок совпадает с ORDER BY (name, uid) / uid в БД; имена
+        сравниваются по кодовым точкам (как COLLATE "C").
+
+        Если подходящих товаров много, товары перебираются в порядке
+        сортировки (с позиции ключа after) до набора страницы: обход
+        занимает около (skip + page_size) * N / total шагов. Иначе ключи
+        всех подходящих товаров (total) отбираются через heapq.nsmallest.
+
+        Args:
+            bitmap: Битовая карта подходящих товаров.
+            sort: Поле сортировки ("name" или "uid").
+            page: Номер страницы (если after не указан).
+            page_size: Размер страницы.
+            after: Ключ последнего товара предыдущей страницы.
+
+        Returns:
+            uids: UUID товаров страницы в порядке сортировки.
+            total: Общее количество подходящих товаров.
+        """
+        bitmap &= self.alive
+        total = bitmaps.count(bitmap)
+        skip = 0 if after is not None else (page - 1) * page_size
+        needed = skip + page_size
+        if not total or skip >= total:
+            return [], total
+
+        keys, ordinals = self._order(sort)
+        if needed * len(ordinals) <= total * total:
+            start = bisect_right(keys, after) if after is not None else 0
+            contains = bitmaps.membership(bitmap, len(self.uids))
+            selected: List[UUID] = []
+            for index in range(start, len(ordinals)):
+                ordinal = ordinals[index]
+                if not contains(ordinal):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                selected.append(self.uids[ordinal])
+                if len(selected) == page_size:
+                    break
+            return selected, total
+
+        candidates = (self._key(o, sort) for o in bitmaps.iterate(bitmap))
+        if after is not None:
+            candidates = (key for key in candidates if key > after)
+        selected_keys = heapq.nsmallest(needed, candidates)[skip:]
+        return [key[-1] for key in selected_keys], total
+
+
+product_ordinals = ProductOrdinals()
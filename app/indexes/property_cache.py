@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.properties_model import Property, PropertyValue
+from schemas.product_schema import PropertyValueRef
+
+logger = logging.getLogger(__name__)
+
+# Минимальный интервал между принудительными перезагрузками снимка, сек
+RELOAD_INTERVAL = 1.0
+
+
+class PropertyMetadataCache:
+    """
+    Версионированный кэш метаданных свойств для проверки товаров.
+
+    Хранит тип каждого свойства и множество допустимых value_uid для
+    list-свойств. PropertyCRUD увеличивает версию при изменении свойств;
+    снимок перечитывается из БД при следующем обращении. Свойства,
+    созданные другим процессом, подхватываются повторной загрузкой перед
+    отклонением товара, удаленные - после ошибки внешнего ключа при вставке.
+    """
+
+    def __init__(self) -> None:
+        self.types: Dict[UUID, str] = {}
+        self.values: Dict[UUID, Set[UUID]] = {}
+        self.version = 0
+        self.loaded_version: Optional[int] = None
+        self.loaded_at = 0.0
+        # Номер загруженного снимка: меняется при каждой загрузке, в том числе
+        # принудительной, и входит в ключ кэша разобранных фильтров
+        self.snapshot_id = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Пометка снимка устаревшим."""
+        self.version += 1
+
+    async def load(self, session: AsyncSession) -> None:
+        """Загрузка снимка из БД."""
+        version = self.version
+        properties = await session.execute(select(Property.uid, Property.type))
+        values = await session.execute(
+            select(PropertyValue.property_uid, PropertyValue.uid)
+        )
+        types = dict(properties.all())
+        value_uids: Dict[UUID, Set[UUID]] = {}
+        for property_uid, value_uid in values:
+            value_uids.setdefault(property_uid, set()).add(value_uid)
+
+        self.types = types
+        self.values = value_uids
+        # Если кэш инвалидирован во время загрузки, снимок перечитается снова
+        self.loaded_version = version
+        self.loaded_at = time.monotonic()
+        self.snapshot_id += 1
+        logger.info("Загружены метаданные %s свойств (версия %s)", len(types), version)
+
+    async def ensure_loaded(self, session: AsyncSession, force: bool = False) -> None:
+        """Загрузка снимка, если он устарел или force=True."""
+        if not force and self.loaded_version == self.version:
+            return
+        async with self._lock:
+            if force or self.loaded_version != self.version:
+                await self.load(session)
+
+    async def reload(self, session: AsyncSession) -> bool:
+        """
+        Принудительная перезагрузка снимка не чаще раза в RELOAD_INTERVAL секунд.
+
+        Returns:
+            True, если снимок перечитан.
+        """
+        if time.monotonic() - self.loaded_at < RELOAD_INTERVAL:
+            return False
+        await self.ensure_loaded(session, force=True)
+        return True
+
+    def check(self, properties: Iterable[PropertyValueRef]) -> Optional[str]:
+        """
+        Проверка свойств товара по снимку.
+
+        Returns:
+            Описание первой ошибки или None.
+        """
+        seen = set()
+        for prop in properties:
+            prop_type = self.types.get(prop.uid)
+            if prop_type is None:
+                return f"Property {prop.uid} does not exist"
+            if prop.uid in seen:
+                return f"Property {prop.uid} is specified more than once"
+            seen.add(prop.uid)
+
+            if prop_type == "list" and not prop.value_uid:
+                return f"Property {prop.uid} requires value_uid (type: list)"
+            if prop_type == "int" and prop.value is None:
+                return f"Property {prop.uid} requires value (type: int)"
+            if prop_type == "int" and prop.value_uid:
+                return f"Property {prop.uid} shouldn't have value_uid (type: int)"
+            if prop.value_uid and prop.value_uid not in self.values.get(prop.uid, ()):
+                return (
+                    f"Property value {prop.value_uid} does not exist "
+                    f"for property {prop.uid}"
+                )
+        return None
+
+    def is_stale_for(self, properties: Iterable[PropertyValueRef]) -> bool:
+        """Ссылается ли товар на свойства или значения, которых нет в снимке."""
+        return any(
+            prop.uid not in self.types
+            or (prop.value_uid and prop.value_uid not in self.values.get(prop.uid, ()))
+            for prop in properties
+        )
+
+    async def prepare(
+        self,
+        session: AsyncSession,
+        products_properties: Iterable[Iterable[PropertyValueRef]],
+    ) -> None:
+        """
+        Подготовка снимка к проверке товаров.
+
+        Если товары ссылаются на неизвестные свойства или значения, снимок
+        перечитывается (не чаще раза в RELOAD_INTERVAL секунд).
+        """
+        await self.ensure_loaded(session)
+        if time.monotonic() - self.loaded_at < RELOAD_INTERVAL:
+            return
+        if any(self.is_stale_for(properties) for properties in products_properties):
+            await self.reload(session)
+
+
+property_cache = PropertyMetadataCache()
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Optional
+
+from core.cache import catalog_generation
+from core.config import settings
+from database.database import db_helper
+from indexes.facet_index import FacetIndex, facet_index
+from indexes.int_columns import IntColumnIndex, int_columns
+from indexes.name_search import create_name_search, name_search
+from indexes.ordinals import ProductOrdinals, product_ordinals
+
+logger = logging.getLogger(__name__)
+
+
+class IndexRebuilder:
+    """
+    Построение и периодическое перестроение in-memory индексов каталога.
+
+    Индексы живут в памяти процесса и обновляются только его write-путями,
+    поэтому записи других воркеров видны в них лишь после перестроения.
+    Новые индексы строятся рядом с текущими и подменяют их без await:
+    запрос видит либо старый снимок, либо новый целиком. Записи этого
+    процесса, сделанные во время построения, могут не попасть в снимок
+    и появятся в нем при следующем перестроении.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def rebuild(self) -> None:
+        """Построение включенных индексов по данным из БД."""
+        ordinals = ProductOrdinals()
+        facets = FacetIndex(ordinals)
+        ints = IntColumnIndex(ordinals)
+        names = create_name_search(settings.search.name_backend)
+        async with db_helper.session_factory() as session:
+            if settings.index.facet_index or settings.index.int_columns:
+                await ordinals.load_products(session)
+            if settings.index.facet_index:
+                await facets.load(session)
+            if settings.index.int_columns:
+                await ints.load(session)
+            await names.load(session)
+
+        product_ordinals.replace(ordinals)
+        facet_index.replace(facets)
+        int_columns.replace(ints)
+        name_search.replace(names)
+        # Закэшированные страницы каталога построены по старому снимку
+        catalog_generation.bump()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error("Ошибка перестроения in-memory индексов: %s", e)
+
+    def start(self) -> None:
+        """Запуск фонового перестроения, если задан интервал."""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+index_rebuilder = IndexRebuilder(settings.index.rebuild_interval)
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from indexes.bitmaps import Bitmap, bitmaps
+from indexes.facet_index import facet_index
+from indexes.int_columns import int_columns
+from indexes.ordinals import product_ordinals
+
+StatisticsRow = Tuple[
+    str, Optional[UUID], Optional[UUID], int, Optional[int], Optional[int]
+]
+
+
+def statistics_available() -> bool:
+    """Оба in-memory индекса построены и статистику можно считать без БД."""
+    return facet_index.ready and int_columns.ready
+
+
+def compute_statistics(
+    filters: Dict[UUID, List[UUID]],
+    ranges: Dict[UUID, Dict[str, int]],
+) -> List[StatisticsRow]:
+    """
+    Дизъюнктивная статистика фасетов по in-memory индексам.
+
+    Возвращает строки той же формы, что и build_facet_statistics_query:
+    (kind, property_uid, value_uid, count, min, max).
+
+    Args:
+        filters: Фильтры list-свойств с UUID-ключами.
+        ranges: Диапазоны int-свойств с UUID-ключами.
+    """
+    alive = product_ordinals.alive
+    size = len(product_ordinals)
+
+    filter_bitmaps: Dict[UUID, Bitmap] = {}
+    for property_uid, value_uids in filters.items():
+        filter_bitmaps[property_uid] = facet_index.match({property_uid: value_uids})
+    for property_uid, range_values in ranges.items():
+        filter_bitmaps[property_uid] = filter_bitmaps.get(
+            property_uid, alive
+        ) & int_columns.match({property_uid: range_values})
+
+    bases: Dict[Optional[UUID], Bitmap] = {}
+
+    def base(excluded: Optional[UUID]) -> Bitmap:
+        # Товары, прошедшие все фильтры, кроме фильтра по excluded
+        if excluded not in filter_bitmaps:
+            excluded = None
+        if excluded not in bases:
+            result = alive
+            for property_uid, bitmap in filter_bitmaps.items():
+                if property_uid != excluded:
+                    result &= bitmap
+            bases[excluded] = result
+        return bases[excluded]
+
+    rows: List[StatisticsRow] = [
+        ("total", None, None, bitmaps.count(base(None)), None, None)
+    ]
+
+    for (property_uid, value_uid), bitmap in facet_index.bitmaps.items():
+        count = bitmaps.count(bitmap & base(property_uid))
+        if count:
+            rows.append(("list", property_uid, value_uid, count, None, None))
+
+    masks: Dict[int, object] = {}
+    for property_uid in int_columns.property_uids():
+        bitmap = base(property_uid)
+        mask = masks.get(id(bitmap))
+        if mask is None:
+            mask = masks[id(bitmap)] = bitmaps.to_mask(bitmap, size)
+        count, min_value, max_value = int_columns.bounds(property_uid, mask)
+        if count:
+            rows.append(("int", property_uid, None, count, min_value, max_value))
+
+    return rows
@@ -1,27 +1,49 @@
 import logging
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request
 
+from core.cache import catalog_generation
 from core.config import settings
+from core.request_context import RequestContextMiddleware
+from core.metrics import (
+    RequestMetrics,
+    current_request,
+    http_request_db_duration,
+    http_request_db_queries,
+    http_request_duration,
+    http_requests_total,
+)
+from database.database import db_helper
+from indexes.property_cache import property_cache
+from indexes.rebuild import index_rebuilder
 
 from routers.properties import router as properties_router
 from routers.catalogs import router as catalog_router
 from routers.products import router as product_router
-
-logging.basicConfig(
-    level=settings.logging.log_level_value,
-    format=settings.logging.log_format,
-)
+from routers.diagnostics import router as diagnostics_router
+from routers.metrics import router as metrics_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[dict, None]:
     """Управление жизненным циклом приложения."""
     logging.info("Инициализация приложения...")
+    await index_rebuilder.rebuild()
+    async with db_helper.session_factory() as session:
+        # Метаданные свойств нужны для разбора фильтров каталога
+        await property_cache.ensure_loaded(session)
+    await catalog_generation.load()
+    db_helper.start_health_checks()
+    index_rebuilder.start()
+    catalog_generation.start()
     yield
     logging.info("Завершение работы приложения...")
+    await catalog_generation.stop()
+    await index_rebuilder.stop()
+    await db_helper.stop_health_checks()
 
 
 def create_app() -> FastAPI:
@@ -38,10 +60,55 @@ def create_app() -> FastAPI:
 
     # Регистрация роутеров
     register_routers(app)
+    register_middlewares(app)
 
     return app
 
 
+def register_middlewares(app: FastAPI) -> None:
+    """Регистрация middleware приложения."""
+
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        # После успешной записи чтения клиента временно идут в primary
+        response = await call_next(request)
+        if (
+            db_helper.replicas
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+        ):
+            db_helper.mark_write(response)
+        return response
+
+    if settings.metrics.enabled:
+
+        @app.middleware("http")
+        async def collect_metrics(request: Request, call_next):
+            request_metrics = RequestMetrics()
+            token = current_request.set(request_metrics)
+            started = time.perf_counter()
+            try:
+                response = await call_next(request)
+            finally:
+                current_request.reset(token)
+            elapsed = time.perf_counter() - started
+
+            # Шаблон пути, а не сам путь: число меток не зависит от UUID
+            route = request.scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            method = request.method
+            http_requests_total.inc(method, route_path, str(response.status_code))
+            http_request_duration.observe(elapsed, method, route_path)
+            http_request_db_queries.observe(request_metrics.queries, method, route_path)
+            http_request_db_duration.observe(
+                request_metrics.query_time, method, route_path
+            )
+            return response
+
+    # Внешний слой: scope запроса доступен обработчикам событий БД
+    app.add_middleware(RequestContextMiddleware)
+
+
 def register_routers(app: FastAPI) -> None:
     """Регистрация роутеров приложения."""
     # Корневой роутер
@@ -58,6 +125,9 @@ def register_routers(app: FastAPI) -> None:
     app.include_router(properties_router, tags=["properties"])
     app.include_router(catalog_router, tags=["catalog"])
     app.include_router(product_router, tags=["product"])
+    app.include_router(diagnostics_router, tags=["diagnostics"])
+    if settings.metrics.enabled:
+        app.include_router(metrics_router, tags=["metrics"])
 
 
 # Создание экземпляра приложения
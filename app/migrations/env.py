@@ -16,6 +16,7 @@ from models.product_model import (
     Property,
     PropertyValue,
 )
+from models.facet_model import CatalogCounter, FacetCount, FacetIntBounds
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,57 @@
+"""product properties covering indexes
+
+Revision ID: 014489dae8b1
+Revises: 2e61f780304c
+Create Date: 2026-10-17 18:42:06.517203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "014489dae8b1"
+down_revision: Union[str, None] = "2e61f780304c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Фильтры и статистика фасетов читаются index-only scan без обращения к таблице
+    op.create_index(
+        "ix_product_property_values_property_uid_value_uid_product_uid",
+        "product_property_values",
+        ["property_uid", "value_uid", "product_uid"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_product_property_ints_property_uid_value_product_uid",
+        "product_property_ints",
+        ["property_uid", "value", "product_uid"],
+        unique=False,
+    )
+    # uid уже проиндексированы первичными ключами
+    op.drop_index(op.f("ix_products_uid"), table_name="products")
+    op.drop_index(op.f("ix_properties_uid"), table_name="properties")
+    op.drop_index(op.f("ix_property_values_uid"), table_name="property_values")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_property_values_uid"), "property_values", ["uid"], unique=False
+    )
+    op.create_index(op.f("ix_properties_uid"), "properties", ["uid"], unique=False)
+    op.create_index(op.f("ix_products_uid"), "products", ["uid"], unique=False)
+    op.drop_index(
+        "ix_product_property_ints_property_uid_value_product_uid",
+        table_name="product_property_ints",
+    )
+    op.drop_index(
+        "ix_product_property_values_property_uid_value_uid_product_uid",
+        table_name="product_property_values",
+    )
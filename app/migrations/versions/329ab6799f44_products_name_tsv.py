@@ -0,0 +1,46 @@
+"""products name tsv
+
+Revision ID: 329ab6799f44
+Revises: da4af8b1debf
+Create Date: 2026-10-17 14:11:26.074519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "329ab6799f44"
+down_revision: Union[str, None] = "da4af8b1debf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products",
+        sa.Column(
+            "name_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', name)", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_products_name_tsv",
+        "products",
+        ["name_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_name_tsv", table_name="products")
+    op.drop_column("products", "name_tsv")
@@ -0,0 +1,45 @@
+"""product properties on delete cascade
+
+Revision ID: 644757b11ef2
+Revises: 329ab6799f44
+Create Date: 2026-10-17 15:02:41.518306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "644757b11ef2"
+down_revision: Union[str, None] = "329ab6799f44"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRODUCT_FOREIGN_KEYS = (
+    ("fk_product_property_ints_product_uid_products", "product_property_ints"),
+    ("fk_product_property_values_product_uid_products", "product_property_values"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table in PRODUCT_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(
+            name,
+            table,
+            "products",
+            ["product_uid"],
+            ["uid"],
+            ondelete="CASCADE",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table in PRODUCT_FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(name, table, "products", ["product_uid"], ["uid"])
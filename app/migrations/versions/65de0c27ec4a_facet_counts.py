@@ -0,0 +1,95 @@
+"""facet counts
+
+Revision ID: 65de0c27ec4a
+Revises: f77a5d0de5ab
+Create Date: 2026-10-17 12:40:07.518342
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "65de0c27ec4a"
+down_revision: Union[str, None] = "f77a5d0de5ab"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "facet_counts",
+        sa.Column("property_uid", sa.UUID(), nullable=False),
+        sa.Column("value_uid", sa.UUID(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["property_uid"],
+            ["properties.uid"],
+            name=op.f("fk_facet_counts_property_uid_properties"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["value_uid"],
+            ["property_values.uid"],
+            name=op.f("fk_facet_counts_value_uid_property_values"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "property_uid", "value_uid", name=op.f("pk_facet_counts")
+        ),
+    )
+    op.create_table(
+        "facet_int_bounds",
+        sa.Column("property_uid", sa.UUID(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("min_value", sa.Integer(), nullable=True),
+        sa.Column("max_value", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["property_uid"],
+            ["properties.uid"],
+            name=op.f("fk_facet_int_bounds_property_uid_properties"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("property_uid", name=op.f("pk_facet_int_bounds")),
+    )
+    op.create_table(
+        "catalog_counters",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name", name=op.f("pk_catalog_counters")),
+    )
+
+    # Заполнение счетчиков по существующим данным
+    op.execute(
+        """
+        INSERT INTO facet_counts (property_uid, value_uid, count)
+        SELECT property_uid, value_uid, count(*)
+        FROM product_property_values
+        GROUP BY property_uid, value_uid
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO facet_int_bounds (property_uid, count, min_value, max_value)
+        SELECT property_uid, count(*), min(value), max(value)
+        FROM product_property_ints
+        GROUP BY property_uid
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO catalog_counters (name, value)
+        SELECT 'products', count(*) FROM products
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("catalog_counters")
+    op.drop_table("facet_int_bounds")
+    op.drop_table("facet_counts")
@@ -0,0 +1,37 @@
+"""products name uid index collate c
+
+Revision ID: a5e105cdd44a
+Revises: 014489dae8b1
+Create Date: 2026-10-17 21:05:37.184260
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a5e105cdd44a"
+down_revision: Union[str, None] = "014489dae8b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Сортировка по имени выполняется в COLLATE "C"
+    op.drop_index("ix_products_name_uid", table_name="products")
+    op.create_index(
+        "ix_products_name_uid",
+        "products",
+        [sa.text('name COLLATE "C"'), "uid"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_name_uid", table_name="products")
+    op.create_index("ix_products_name_uid", "products", ["name", "uid"], unique=False)
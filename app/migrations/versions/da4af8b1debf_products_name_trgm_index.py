@@ -0,0 +1,37 @@
+"""products name trgm index
+
+Revision ID: da4af8b1debf
+Revises: 65de0c27ec4a
+Create Date: 2026-10-17 14:05:52.880213
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "da4af8b1debf"
+down_revision: Union[str, None] = "65de0c27ec4a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_products_name_trgm",
+        "products",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_name_trgm", table_name="products")
@@ -0,0 +1,29 @@
+"""products name uid index
+
+Revision ID: f77a5d0de5ab
+Revises: bb127b09c122
+Create Date: 2026-10-17 10:12:41.305118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f77a5d0de5ab"
+down_revision: Union[str, None] = "bb127b09c122"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_products_name_uid", "products", ["name", "uid"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_name_uid", table_name="products")
@@ -0,0 +1,43 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.base import Base
+
+
+class FacetCount(Base):
+    """Материализованное количество товаров на значение list-свойства"""
+
+    __tablename__ = "facet_counts"
+
+    property_uid: Mapped[UUID] = mapped_column(
+        ForeignKey("properties.uid", ondelete="CASCADE"), primary_key=True
+    )
+    value_uid: Mapped[UUID] = mapped_column(
+        ForeignKey("property_values.uid", ondelete="CASCADE"), primary_key=True
+    )
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class FacetIntBounds(Base):
+    """Материализованные количество товаров и min/max int-свойства"""
+
+    __tablename__ = "facet_int_bounds"
+
+    property_uid: Mapped[UUID] = mapped_column(
+        ForeignKey("properties.uid", ondelete="CASCADE"), primary_key=True
+    )
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    min_value: Mapped[Optional[int]] = mapped_column(Integer)
+    max_value: Mapped[Optional[int]] = mapped_column(Integer)
+
+
+class CatalogCounter(Base):
+    """Именованные счетчики каталога (например, общее количество товаров)"""
+
+    __tablename__ = "catalog_counters"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
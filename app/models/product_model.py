@@ -1,6 +1,7 @@
+from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from database.base import Base
@@ -9,26 +10,47 @@ from models.properties_model import Property, PropertyValue
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Индекс для keyset-пагинации с сортировкой по имени (COLLATE "C",
+        # как ORDER BY в ProductCRUD._paginate)
+        Index("ix_products_name_uid", text('name COLLATE "C"'), "uid"),
+    )
 
     uid: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), primary_key=True, index=True, default=uuid4
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
     name: Mapped[str] = mapped_column(nullable=False)
+    # Версия товара для ETag: время последней записи
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
 
-    # Связи с таблицами свойств
+    # Связи с таблицами свойств; строки свойств удаляет каскад в БД
     property_values: Mapped[list["ProductPropertyValue"]] = relationship(
-        back_populates="product"
+        back_populates="product", cascade="all, delete-orphan", passive_deletes=True
     )
     property_ints: Mapped[list["ProductPropertyInt"]] = relationship(
-        back_populates="product"
+        back_populates="product", cascade="all, delete-orphan", passive_deletes=True
     )
 
 
 class ProductPropertyValue(Base):
     __tablename__ = "product_property_values"
+    __table_args__ = (
+        # Покрывающий индекс фильтров и статистики list-свойств
+        Index(
+            "ix_product_property_values_property_uid_value_uid_product_uid",
+            "property_uid",
+            "value_uid",
+            "product_uid",
+        ),
+    )
 
     product_uid: Mapped[UUID] = mapped_column(
-        ForeignKey("products.uid"), primary_key=True
+        ForeignKey("products.uid", ondelete="CASCADE"), primary_key=True
     )
     property_uid: Mapped[UUID] = mapped_column(
         ForeignKey("properties.uid"), primary_key=True
@@ -45,9 +67,18 @@ class ProductPropertyValue(Base):
 
 class ProductPropertyInt(Base):
     __tablename__ = "product_property_ints"
+    __table_args__ = (
+        # Покрывающий индекс диапазонов и статистики int-свойств
+        Index(
+            "ix_product_property_ints_property_uid_value_product_uid",
+            "property_uid",
+            "value",
+            "product_uid",
+        ),
+    )
 
     product_uid: Mapped[str] = mapped_column(
-        ForeignKey("products.uid"), primary_key=True
+        ForeignKey("products.uid", ondelete="CASCADE"), primary_key=True
     )
     property_uid: Mapped[str] = mapped_column(
         ForeignKey("properties.uid"), primary_key=True
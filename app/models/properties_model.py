@@ -11,7 +11,7 @@ class Property(Base):
     __tablename__ = "properties"
 
     uid: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), primary_key=True, index=True, default=uuid4
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
     name: Mapped[str] = mapped_column(nullable=False)
     type: Mapped[str] = mapped_column(
@@ -27,7 +27,7 @@ class PropertyValue(Base):
     __tablename__ = "property_values"
 
     uid: Mapped[UUID] = mapped_column(
-        PG_UUID(as_uuid=True), primary_key=True, index=True, default=uuid4
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
     property_uid: Mapped[str] = mapped_column(
         ForeignKey("properties.uid", ondelete="CASCADE"), nullable=False
@@ -1,55 +1,188 @@
-from fastapi import APIRouter, Depends, Query, Request
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import (
+    canonical_query,
+    catalog_cache,
+    catalog_etag,
+    catalog_generation,
+    etag_matches,
+)
+from core.config import settings
+from crud.filter_spec import load_filter_spec
 from crud.products_crud import ProductCRUD
 from database.database import db_helper
-from utils import parse_query_params
+from database.query_budget import query_budget
+from utils import (
+    catalog_page_json,
+    catalog_product_to_response,
+    decode_cursor,
+    encode_cursor,
+    export_csv,
+    export_ndjson,
+    json_dumps,
+)
 
 router = APIRouter()
 
 
 @router.get("/catalog/")
+# Страница с общим количеством (подзапрос) + свойства товаров страницы
+# (два selectinload); для пустой страницы - отдельный подсчет без свойств
+@query_budget(3)
 async def get_catalog(
     request: Request,
-    session: AsyncSession = Depends(db_helper.session_getter),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    sort: str = Query(None, regex="^(name|uid)$"),
+    sort: str = Query(None, regex="^(name|uid|relevance)$"),
+    cursor: Optional[str] = Query(None),
 ):
 
     raw_query_string = request.scope["query_string"].decode("utf-8")
 
-    filters, ranges, name, sort = await parse_query_params(raw_query_string)
+    # Попадание в кэш и совпадение ETag обслуживаются без сессии БД
+    cache_key = canonical_query(raw_query_string)
+    generation = catalog_generation.value
+    headers = {}
+    # Клиент после записи читает из primary мимо кэша и без ETag: страница
+    # в кэше могла быть построена по отстающей реплике
+    sticky = db_helper.is_sticky(request)
+    if not sticky:
+        # ETag зависит только от поколения каталога и запроса и проверяется
+        # до кэша, поэтому не требует ни кэша, ни запроса к БД
+        etag = catalog_etag(cache_key, catalog_generation.stored)
+        headers["ETag"] = etag
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    crud = ProductCRUD(session)
+    use_cache = settings.cache.catalog_enabled and not sticky
+    if use_cache:
+        body = catalog_cache.get(cache_key, generation)
+        if body is not None:
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={**headers, "X-Cache": "HIT"},
+            )
 
-    products, total = await crud.filter_products(
-        filters, ranges, name, sort, page, page_size
-    )
+    sort = sort or "uid"
 
-    return {
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "products": products,
-    }
+    after = None
+    if cursor and sort == "relevance":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported for sort=relevance",
+        )
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async with db_helper.read_session_factory(request)() as session:
+        spec = await load_filter_spec(session, raw_query_string)
+        crud = ProductCRUD(session)
+
+        if settings.catalog.projection == "json":
+            rows, total = await crud.filter_products_json(spec, page, page_size, after)
+            next_cursor = None
+            if len(rows) == page_size and sort != "relevance":
+                next_cursor = encode_cursor(sort, rows[-1])
+            response = Response(
+                content=catalog_page_json(
+                    total, page, page_size, next_cursor, [row.product for row in rows]
+                ),
+                media_type="application/json",
+                headers={**headers, "X-Cache": "MISS"},
+            )
+        else:
+            products, total = await crud.filter_products(spec, page, page_size, after)
+
+            next_cursor = None
+            if len(products) == page_size and sort != "relevance":
+                next_cursor = encode_cursor(sort, products[-1])
+
+            response = Response(
+                content=json_dumps(
+                    {
+                        "total": total,
+                        "page": page,
+                        "page_size": page_size,
+                        "next_cursor": next_cursor,
+                        "products": [
+                            catalog_product_to_response(product) for product in products
+                        ],
+                    }
+                ),
+                media_type="application/json",
+                headers={**headers, "X-Cache": "MISS"},
+            )
+
+    if use_cache:
+        catalog_cache.set(cache_key, generation, response.body)
+    return response
 
 
 @router.get("/catalog/filter/")
+@query_budget(1)
 async def filter_catalog(
     request: Request,
-    session: AsyncSession = Depends(db_helper.session_getter),
+    session: AsyncSession = Depends(db_helper.read_session_getter),
 ):
     raw_query_string = request.scope["query_string"].decode("utf-8")
-    filters, ranges, _, _ = parse_query_params(raw_query_string)
+    spec = await load_filter_spec(session, raw_query_string)
 
     crud = ProductCRUD(session)
 
-    property_stats = await crud.get_filter_statistics(filters, ranges)
-
-    total_count = sum(stats.count for stats in property_stats.values())
+    total_count, property_stats = await crud.get_filter_statistics(spec)
 
     return {
         "count": total_count,
         "properties": property_stats,
     }
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@router.get("/catalog/export")
+# На выгрузку до settings.export.batch_size товаров: курсор и свойства пачки
+@query_budget(3)
+async def export_catalog(
+    request: Request,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+):
+    raw_query_string = request.scope["query_string"].decode("utf-8")
+    read_session_factory = db_helper.read_session_factory(request)
+    # Фильтр разбирается до начала потока, чтобы ошибка вернулась кодом 422
+    async with read_session_factory() as session:
+        spec = await load_filter_spec(session, raw_query_string)
+    conditions = ProductCRUD.export_conditions(spec)
+
+    async def content():
+        # Сессия живет столько же, сколько поток ответа
+        async with read_session_factory() as session:
+            crud = ProductCRUD(session)
+            header = format == "csv"
+            async for products in crud.export_products(
+                conditions, settings.export.batch_size
+            ):
+                if format == "csv":
+                    yield export_csv(products, header=header)
+                    header = False
+                else:
+                    yield export_ndjson(products)
+            if header:
+                yield export_csv([], header=True)
+
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=catalog.{format}"},
+    )
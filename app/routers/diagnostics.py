@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+
+from core.admin import require_admin
+from core.config import settings
+from database.slow_queries import slow_query_log
+from database.statement_stats import statement_cache_stats
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/diagnostics/statement-cache")
+async def get_statement_cache_stats():
+    """Попадания в кэши скомпилированных и подготовленных запросов"""
+    return {
+        **statement_cache_stats.snapshot(),
+        "query_cache_size": settings.db.query_cache_size,
+        "prepared_statement_cache_size": settings.db.prepared_statement_cache_size,
+        "filter_shape": settings.catalog.filter_shape,
+    }
+
+
+@router.delete("/diagnostics/statement-cache")
+async def reset_statement_cache_stats():
+    """Сброс счетчиков, например перед нагрузочным прогоном"""
+    statement_cache_stats.reset()
+    return {"response": "statement cache stats reset"}
+
+
+@router.get("/diagnostics/slow-queries")
+async def get_slow_queries():
+    """Медленные запросы и планы EXPLAIN (ANALYZE, BUFFERS) для их выборки"""
+    return {"enabled": settings.slow_query.enabled, **slow_query_log.snapshot()}
+
+
+@router.delete("/diagnostics/slow-queries")
+async def clear_slow_queries():
+    """Очистка журнала медленных запросов"""
+    slow_query_log.clear()
+    return {"response": "slow query log cleared"}
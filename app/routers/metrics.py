@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Response
+
+from core.admin import require_admin
+from core.metrics import registry
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Метрики в текстовом формате Prometheus"""
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
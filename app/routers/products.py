@@ -1,28 +1,122 @@
-from typing import Annotated
+import logging
+from typing import Annotated, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import etag_matches, product_etag
+from core.config import settings
 from crud.products_crud import ProductCRUD
 from database.database import db_helper
+from database.query_budget import query_budget
 from schemas.product_schema import ProductCreate
-from utils import product_to_response
+from utils import (
+    iter_json_array_items,
+    iter_ndjson_items,
+    json_dumps,
+    product_to_response,
+)
+
+# Настройка логгера
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/product/{uid}", response_model_exclude_none=True)
+@router.get("/product/{product_uid}")
+# Товар с int-свойствами + list-свойства (только для ответа с телом)
+@query_budget(2)
 async def get_product(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    request: Request,
+    session: Annotated[AsyncSession, Depends(db_helper.read_session_getter)],
     product_uid: UUID,
 ):
     crud = ProductCRUD(session)
     product = await crud.get_product(product_uid)
-    return product_to_response(product)
+    etag = product_etag(product.updated_at)
+
+    # Условный запрос проверяется до загрузки list-свойств и сериализации
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+
+    await crud.load_property_values(product)
+    return Response(
+        content=json_dumps(product_to_response(product)),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/products")
+@query_budget(3)
+async def get_products(
+    session: Annotated[AsyncSession, Depends(db_helper.read_session_getter)],
+    uids: Annotated[List[str], Query()],
+):
+    """
+    Получение нескольких товаров за один запрос.
+
+    UUID передаются повторяющимся параметром (?uids=a&uids=b) или через
+    запятую. Товары возвращаются в порядке запроса; на месте
+    отсутствующих - null, их UUID перечислены в missing.
+    """
+    try:
+        product_uids = [
+            UUID(uid.strip())
+            for value in uids
+            for uid in value.split(",")
+            if uid.strip()
+        ]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
+    if not product_uids:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="At least one uid is required",
+        )
+    if len(product_uids) > settings.catalog.multi_get_limit:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.catalog.multi_get_limit} uids are allowed",
+        )
+
+    crud = ProductCRUD(session)
+    found = await crud.get_products(list(dict.fromkeys(product_uids)))
+    return Response(
+        content=json_dumps(
+            {
+                "products": [
+                    product_to_response(found[uid]) if uid in found else None
+                    for uid in product_uids
+                ],
+                "missing": [
+                    uid for uid in dict.fromkeys(product_uids) if uid not in found
+                ],
+            }
+        ),
+        media_type="application/json",
+    )
 
 
 @router.post("/product/")
+# Метаданные свойств (при перечитывании) + вставки + счетчики фасетов
+@query_budget(8)
 async def add_product(
     product_data: ProductCreate,
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
@@ -32,7 +126,106 @@ async def add_product(
     return product
 
 
-@router.delete("/product/{uid}")
+@router.post("/product/bulk")
+# На пачку до settings.bulk.chunk_size товаров
+@query_budget(9)
+async def add_products_bulk(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+):
+    """
+    Массовая загрузка товаров.
+
+    Тело запроса - JSON-массив товаров или NDJSON (Content-Type:
+    application/x-ndjson), который обрабатывается по мере получения.
+    Товары проверяются и вставляются пачками по settings.bulk.chunk_size.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = iter_ndjson_items(request.stream())
+    else:
+        try:
+            items = iter_json_array_items(await request.body())
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+            )
+
+    crud = ProductCRUD(session)
+    created, errors, chunk = 0, [], []
+
+    async def flush():
+        nonlocal created
+        chunk_created, chunk_errors = await crud.bulk_create_products(chunk)
+        created += chunk_created
+        errors.extend(chunk_errors)
+        chunk.clear()
+
+    async for index, product_data, detail in items:
+        if detail:
+            errors.append({"index": index, "uid": None, "detail": detail})
+            continue
+        chunk.append((index, product_data))
+        if len(chunk) >= settings.bulk.chunk_size:
+            await flush()
+    if chunk:
+        await flush()
+
+    errors.sort(key=lambda error: error["index"])
+    return {"created": created, "failed": len(errors), "errors": errors}
+
+
+@router.delete("/product/")
+# На пачку до settings.bulk.chunk_size товаров; запрос из нескольких пачек
+# добавляет одно уточнение границ int-свойств
+@query_budget(4)
+async def delete_products(
+    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    uids: Annotated[List[UUID], Body()],
+):
+    """
+    Массовое удаление товаров.
+
+    Тело запроса - JSON-массив UUID. Товары удаляются пачками по
+    settings.bulk.chunk_size, каждая пачка - одной транзакцией. Если пачек
+    несколько, min/max int-свойств уточняются один раз после всех пачек
+    (до этого границы могут быть шире фактических).
+    """
+    crud = ProductCRUD(session)
+    requested = list(dict.fromkeys(uids))
+    deleted = set()
+    chunk_size = settings.bulk.chunk_size
+    chunks = [
+        requested[start : start + chunk_size]
+        for start in range(0, len(requested), chunk_size)
+    ]
+    int_values_removed = {} if len(chunks) > 1 else None
+    try:
+        for chunk in chunks:
+            deleted.update(await crud.delete_products(chunk, int_values_removed))
+    except Exception:
+        if int_values_removed:
+            # Границы уточняются и для пачек, удаленных до ошибки: в новой
+            # сессии, а ошибка уточнения не подменяет исходную
+            try:
+                async with db_helper.session_factory() as refresh_session:
+                    await ProductCRUD(refresh_session).refresh_int_bounds(
+                        int_values_removed
+                    )
+            except Exception as e:
+                logger.error(
+                    "Границы int-свойств не уточнены после ошибки удаления: %s", e
+                )
+        raise
+    if int_values_removed:
+        await crud.refresh_int_bounds(int_values_removed)
+    return {
+        "deleted": len(deleted),
+        "missing": [uid for uid in requested if uid not in deleted],
+    }
+
+
+@router.delete("/product/{product_uid}")
+@query_budget(4)
 async def delete_product(
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
     product_uid: UUID,
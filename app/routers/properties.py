@@ -7,12 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from crud.properties_crud import PropertyCRUD
 from database.database import db_helper
+from database.query_budget import query_budget
 from schemas.property_schema import ListPropertyCreate, IntPropertyCreate
 
 router = APIRouter()
 
 
 @router.post("/properties/")
+# + новое поколение каталога в catalog_counters
+@query_budget(7)
 async def add_property(
     property_data: Union[ListPropertyCreate, IntPropertyCreate],
     session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
@@ -37,6 +40,8 @@ async def add_property(
 
 
 @router.delete("/properties/{uid}")
+# + новое поколение каталога в catalog_counters
+@query_budget(6)
 async def delete_property(
     uid: UUID, session: Annotated[AsyncSession, Depends(db_helper.session_getter)]
 ):
@@ -50,8 +55,9 @@ async def delete_property(
 
 
 @router.get("/properties/")
+@query_budget(2)
 async def get_list_properties(
-    session: Annotated[AsyncSession, Depends(db_helper.session_getter)],
+    session: Annotated[AsyncSession, Depends(db_helper.read_session_getter)],
 ):
     crud = PropertyCRUD(session)
     return await crud.get_all_properties()
@@ -1,70 +1,263 @@
-from typing import Dict, Optional, Tuple
-from urllib.parse import parse_qs
+import base64
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from uuid import UUID
 
 from models.product_model import Product
-from schemas.product_schema import ProductCreate, PropertyValueRef
+from schemas.product_schema import ProductCreate
 
+try:
+    import orjson
+except ImportError:  # orjson - необязательная зависимость
+    orjson = None
 
-def product_to_response(product: Product):
-    properties = []
 
-    # Обрабатываем ProductPropertyValue (list-свойства)
-    for prop_value in product.property_values:
-        properties.append(
-            PropertyValueRef(
-                uid=prop_value.property_uid, value_uid=prop_value.value_uid
-            )
-        )
+BulkItem = Tuple[int, Optional[ProductCreate], Optional[str]]
+
+
+def validate_bulk_item(index: int, raw: Any) -> BulkItem:
+    """
+    Проверка одного товара массовой загрузки.
 
-    # Обрабатываем ProductPropertyInt (int-свойства)
-    for prop_int in product.property_ints:
-        properties.append(
-            PropertyValueRef(property_uid=prop_int.property_uid, value=prop_int.value)
+    Returns:
+        (номер, товар, None) или (номер, None, описание ошибки).
+    """
+    try:
+        return index, ProductCreate.model_validate(raw), None
+    except ValidationError as e:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
         )
+        return index, None, detail or str(e)
+
+
+def iter_json_array_items(body: bytes) -> AsyncIterator[BulkItem]:
+    """
+    Товары массовой загрузки из JSON-массива.
+
+    Тело разбирается сразу, чтобы ошибка формата возникла до обработки.
+
+    Raises:
+        ValueError: если тело запроса не является JSON-массивом.
+    """
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array")
+
+    async def iterate() -> AsyncIterator[BulkItem]:
+        for index, raw in enumerate(items):
+            yield validate_bulk_item(index, raw)
+
+    return iterate()
+
+
+async def iter_ndjson_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[BulkItem]:
+    """Товары массовой загрузки из потока NDJSON (по одному JSON на строку)."""
+    index = 0
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(index, line)
+                index += 1
+    if buffer.strip():
+        yield _parse_ndjson_line(index, buffer)
+
+
+def _parse_ndjson_line(index: int, line: bytes) -> BulkItem:
+    try:
+        raw = json.loads(line)
+    except ValueError as e:
+        return index, None, f"Invalid JSON: {str(e)}"
+    return validate_bulk_item(index, raw)
+
+
+def json_dumps(content: Any) -> bytes:
+    """
+    Сериализация в JSON-байты: orjson, если установлен, иначе json.
+
+    UUID сериализуются строками. asyncpg возвращает подкласс uuid.UUID,
+    который orjson не сериализует сам, поэтому он передается в default.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=str)
+    return json.dumps(
+        content, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def product_to_response(product: Product) -> Dict[str, Any]:
+    """
+    Товар в формате GET /product/{uid}.
+
+    Словарь строится напрямую из ORM-объекта, без промежуточных
+    pydantic-моделей; результат совпадает с
+    ProductCreate(...).model_dump(exclude_none=True).
+    """
+    properties = [
+        {"uid": prop_value.property_uid, "value_uid": prop_value.value_uid}
+        for prop_value in product.property_values
+    ]
+    properties.extend(
+        {"uid": prop_int.property_uid, "value": prop_int.value}
+        for prop_int in product.property_ints
+    )
+    return {"uid": product.uid, "name": product.name, "properties": properties}
+
+
+def catalog_product_to_response(product: Product) -> Dict[str, Any]:
+    """
+    Товар в формате списка GET /catalog/.
+
+    Повторяет структуру, которую jsonable_encoder строил по ORM-объекту
+    с загруженными property_values (и их value) и property_ints.
+    """
+    return {
+        "uid": product.uid,
+        "name": product.name,
+        "property_ints": [
+            {
+                "property_uid": prop_int.property_uid,
+                "value": prop_int.value,
+                "product_uid": prop_int.product_uid,
+            }
+            for prop_int in product.property_ints
+        ],
+        "property_values": [
+            {
+                "property_uid": prop_value.property_uid,
+                "value_uid": prop_value.value_uid,
+                "product_uid": prop_value.product_uid,
+                "value": {
+                    "property_uid": prop_value.value.property_uid,
+                    "value": prop_value.value.value,
+                    "uid": prop_value.value.uid,
+                },
+            }
+            for prop_value in product.property_values
+        ],
+    }
+
+
+def catalog_page_json(
+    total: int,
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str],
+    products: List[str],
+) -> bytes:
+    """
+    Тело ответа GET /catalog/ из готовых JSON-строк товаров.
+
+    Товары не декодируются: их JSON, собранный в БД, вставляется как есть.
+    """
+    head = json.dumps(
+        {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+        },
+        separators=(",", ":"),
+    )
+    return f'{head[:-1]},"products":[{",".join(products)}]}}'.encode("utf-8")
 
-    return ProductCreate.model_construct(
-        uid=product.uid, name=product.name, properties=properties
-    ).model_dump(exclude_none=True)
 
+def encode_cursor(sort: str, product: Product) -> str:
+    """
+    Кодирование курсора keyset-пагинации по последнему товару страницы.
+
+    Args:
+        sort: Поле сортировки ("name" или "uid").
+        product: Последний товар на странице.
+
+    Returns:
+        Непрозрачная строка курсора.
+    """
+    payload = [sort, str(product.uid)]
+    if sort == "name":
+        payload.append(product.name)
+    raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
-async def parse_query_params(
-    query_string: str,
-) -> Tuple[Dict, Dict, Optional[str], Optional[str]]:
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, ...]:
     """
-    Парсинг параметров запроса для фильтрации и поиска товаров.
+    Декодирование курсора keyset-пагинации.
 
     Args:
-        query_string: Сырая строка запроса из request.scope["query_string"].
+        cursor: Строка курсора из параметра запроса.
+        sort: Поле сортировки текущего запроса.
 
     Returns:
-        filters: Словарь с фильтрами для свойств типа list.
-        ranges: Словарь с диапазонами для свойств типа int.
-        name: Имя товара для поиска (если указано).
-        sort: Поле для сортировки (если указано).
-    """
-    parsed_query = parse_qs(query_string)
-    filters = {}
-    ranges = {}
-    name = None
-    sort = None
-
-    for key, values in parsed_query.items():
-        if key.startswith("property_"):
-            if key.endswith("_from") or key.endswith("_to"):
-                # Обработка диапазонов
-                base_key = key.rsplit("_", 1)[0]
-                if base_key not in ranges:
-                    ranges[base_key] = {}
-                if key.endswith("_from"):
-                    ranges[base_key]["from"] = int(values[0])
-                elif key.endswith("_to"):
-                    ranges[base_key]["to"] = int(values[0])
-            else:
-                # Обработка списков значений
-                filters[key] = [value for value in values]
-        elif key == "name":
-            name = values[0]
-        elif key == "sort" and values[0] in ["name", "uid"]:
-            sort = values[0]
-
-    return filters, ranges, name, sort
+        Ключ последнего просмотренного товара: (uid,) или (name, uid).
+
+    Raises:
+        ValueError: если курсор поврежден или выдан для другой сортировки.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not (
+            isinstance(payload, list)
+            and len(payload) >= 2
+            and isinstance(payload[1], str)
+        ):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        cursor_sort, uid = payload[0], UUID(payload[1])
+    except (ValueError, TypeError, IndexError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort={cursor_sort}")
+
+    if sort == "name":
+        if len(payload) != 3 or not isinstance(payload[2], str):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return payload[2], uid
+    return (uid,)
+
+
+EXPORT_CSV_COLUMNS = ("uid", "name", "properties")
+
+
+def export_ndjson(products: List[Dict[str, Any]]) -> str:
+    """Пачка товаров выгрузки в формате NDJSON (одна строка JSON на товар)."""
+    return "".join(
+        json.dumps(product, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for product in products
+    )
+
+
+def export_csv(products: List[Dict[str, Any]], header: bool = False) -> str:
+    """
+    Пачка товаров выгрузки в формате CSV.
+
+    Свойства товара записываются в колонку properties как JSON-массив.
+
+    Args:
+        products: Товары пачки.
+        header: Добавить строку заголовка.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_CSV_COLUMNS)
+    writer.writerows(
+        (
+            product["uid"],
+            product["name"],
+            json.dumps(
+                product["properties"], ensure_ascii=False, separators=(",", ":")
+            ),
+        )
+        for product in products
+    )
+    return buffer.getvalue()
@@ -0,0 +1,81 @@
+"""Сводка результатов нагрузочного прогона: перцентили, пропускная способность."""
+
+import math
+from typing import Dict, List, NamedTuple, Sequence
+
+
+class Sample(NamedTuple):
+    endpoint: str
+    latency: float
+    status: int
+    queries: int
+    over_budget: bool
+
+
+class EndpointSummary(NamedTuple):
+    endpoint: str
+    requests: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+    throughput: float
+    queries: float
+    max_queries: int
+    over_budget: int
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Перцентиль методом ближайшего ранга."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> List[EndpointSummary]:
+    """Сводка по каждому сценарию и по всем запросам (строка "всего")."""
+    groups: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        groups.setdefault(sample.endpoint, []).append(sample)
+    groups["всего"] = samples
+
+    summaries = []
+    for endpoint, group in groups.items():
+        latencies = sorted(sample.latency for sample in group)
+        queries = [sample.queries for sample in group]
+        summaries.append(
+            EndpointSummary(
+                endpoint=endpoint,
+                requests=len(group),
+                errors=sum(sample.status >= 500 for sample in group),
+                p50=percentile(latencies, 50),
+                p95=percentile(latencies, 95),
+                p99=percentile(latencies, 99),
+                throughput=len(group) / elapsed if elapsed else 0.0,
+                queries=sum(queries) / len(queries) if queries else 0.0,
+                max_queries=max(queries, default=0),
+                over_budget=sum(sample.over_budget for sample in group),
+            )
+        )
+    return summaries
+
+
+def format_table(title: str, summaries: List[EndpointSummary]) -> str:
+    """Таблица Markdown; задержки в миллисекундах."""
+    lines = [
+        f"### {title}",
+        "",
+        "| сценарий | запросов | ошибок | p50, мс | p95, мс | p99, мс | RPS "
+        "| SQL/запрос | SQL max | сверх бюджета |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for summary in summaries:
+        lines.append(
+            f"| {summary.endpoint} | {summary.requests} | {summary.errors} "
+            f"| {summary.p50 * 1000:.1f} | {summary.p95 * 1000:.1f} "
+            f"| {summary.p99 * 1000:.1f} | {summary.throughput:.1f} "
+            f"| {summary.queries:.1f} | {summary.max_queries} "
+            f"| {summary.over_budget} |"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+import pytest
+
+from core.config import settings
+from main import app
+
+
+def request(method: str, path: str, headers=None) -> httpx.Response:
+    async def send() -> httpx.Response:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.request(method, path, headers=headers)
+
+    return asyncio.run(send())
+
+
+ADMIN_ENDPOINTS = [
+    ("GET", "/metrics"),
+    ("GET", "/diagnostics/statement-cache"),
+    ("DELETE", "/diagnostics/statement-cache"),
+    ("GET", "/diagnostics/slow-queries"),
+    ("DELETE", "/diagnostics/slow-queries"),
+]
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+def test_admin_endpoints_are_disabled_without_token(monkeypatch, method, path):
+    monkeypatch.setattr(settings.admin, "token", None)
+
+    response = request(method, path, {"Authorization": "Bearer "})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("method,path", ADMIN_ENDPOINTS)
+def test_admin_endpoints_require_token(monkeypatch, method, path):
+    monkeypatch.setattr(settings.admin, "token", "secret")
+
+    assert request(method, path).status_code == 401
+    assert request(method, path, {"Authorization": "Bearer wrong"}).status_code == 401
+    response = request(method, path, {"Authorization": "Bearer secret"})
+    assert response.status_code == 200
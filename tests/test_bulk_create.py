@@ -0,0 +1,65 @@
+import asyncio
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from crud.products_crud import ProductCRUD
+from database.database import db_helper
+from database.query_budget import count_queries
+from indexes.property_cache import property_cache
+from models.product_model import Product
+from schemas.product_schema import ProductCreate
+
+
+def test_concurrent_duplicate_rejects_only_conflicting_products(
+    catalog_database, monkeypatch
+):
+    items = [
+        (index, ProductCreate(name=f"Товар {index}", properties=[]))
+        for index in range(20)
+    ]
+    duplicate = items[7][1].uid
+    prepare = property_cache.prepare
+
+    async def prepare_and_insert_duplicate(session, products_properties):
+        # Другой процесс вставляет товар с тем же UUID после проверки
+        await prepare(session, products_properties)
+        monkeypatch.setattr(property_cache, "prepare", prepare)
+        async with db_helper.session_factory() as other:
+            await ProductCRUD(other).bulk_create_products(
+                [(0, ProductCreate(uid=duplicate, name="Дубль", properties=[]))]
+            )
+
+    monkeypatch.setattr(property_cache, "prepare", prepare_and_insert_duplicate)
+
+    async def create():
+        uids = [product.uid for _, product in items]
+        try:
+            async with db_helper.session_factory() as session:
+                with count_queries() as counter:
+                    created, errors = await ProductCRUD(session).bulk_create_products(
+                        items
+                    )
+                stored = set(
+                    await session.scalars(
+                        select(Product.uid).where(Product.uid.in_(uids))
+                    )
+                )
+                await ProductCRUD(session).delete_products(uids)
+            return created, errors, stored, counter.count
+        finally:
+            await db_helper.dispose()
+
+    created, errors, stored, queries = asyncio.run(create())
+
+    assert created == 19
+    assert errors == [
+        {
+            "index": 7,
+            "uid": str(duplicate),
+            "detail": f"Product {duplicate} already exists",
+        }
+    ]
+    assert stored == {product.uid for _, product in items}
+    # Повторная попытка не выполняет запросов на каждый товар
+    assert queries < len(items)
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+
+from core.cache import catalog_generation
+from core.config import settings
+from database.database import db_helper
+from database.query_budget import count_queries
+from main import app
+
+
+async def get_catalog(query: str, headers=None) -> httpx.Response:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get(f"/catalog/?{query}", headers=headers)
+
+
+def test_catalog_etag_is_emitted_without_cache(catalog_database, monkeypatch):
+    monkeypatch.setattr(settings.cache, "catalog_enabled", False)
+
+    async def requests():
+        try:
+            await catalog_generation.load()
+            first = await get_catalog("page=2&page_size=5")
+            with count_queries() as counter:
+                second = await get_catalog(
+                    "page_size=5&page=2", {"If-None-Match": first.headers["ETag"]}
+                )
+            return first, second, counter.count
+        finally:
+            await db_helper.dispose()
+
+    first, second, queries = asyncio.run(requests())
+
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert queries == 0
+
+
+def test_catalog_if_none_match_is_answered_without_database(monkeypatch):
+    monkeypatch.setattr(settings.cache, "catalog_enabled", False)
+    monkeypatch.setattr(catalog_generation, "stored", 41)
+
+    async def requests():
+        with count_queries() as counter:
+            response = await get_catalog("page=1", {"If-None-Match": '"41-x", *'})
+        return response, counter.count
+
+    response, queries = asyncio.run(requests())
+
+    assert response.status_code == 304
+    assert response.headers["ETag"].startswith('"41-')
+    assert queries == 0
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from core.config import settings
+from crud.products_crud import ProductCRUD
+from database.database import db_helper
+from main import app
+from models.product_model import ProductPropertyInt
+
+
+async def products_with_ints(count: int):
+    async with db_helper.session_factory() as session:
+        return list(
+            await session.scalars(
+                select(ProductPropertyInt.product_uid).distinct().limit(count)
+            )
+        )
+
+
+@pytest.mark.parametrize("refresh_fails", [False, True])
+def test_failed_chunk_keeps_original_error(
+    catalog_database, monkeypatch, refresh_fails
+):
+    monkeypatch.setattr(settings.bulk, "chunk_size", 3)
+    delete_products = ProductCRUD.delete_products
+    refresh_int_bounds = ProductCRUD.refresh_int_bounds
+    calls = []
+    refreshed = []
+
+    async def failing_delete(self, product_uids, int_values_removed=None):
+        calls.append(product_uids)
+        if len(calls) == 2:
+            raise HTTPException(status_code=500, detail="chunk failed")
+        return await delete_products(self, product_uids, int_values_removed)
+
+    async def tracked_refresh(self, int_values_removed):
+        refreshed.append(dict(int_values_removed))
+        if refresh_fails:
+            raise HTTPException(status_code=500, detail="refresh failed")
+        await refresh_int_bounds(self, int_values_removed)
+
+    monkeypatch.setattr(ProductCRUD, "delete_products", failing_delete)
+    monkeypatch.setattr(ProductCRUD, "refresh_int_bounds", tracked_refresh)
+
+    async def delete():
+        try:
+            uids = await products_with_ints(9)
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                return await client.request(
+                    "DELETE", "/product/", json=[str(uid) for uid in uids]
+                )
+        finally:
+            await db_helper.dispose()
+
+    response = asyncio.run(delete())
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "chunk failed"}
+    # Границы уточнены для первой пачки, удаленной до ошибки
+    assert len(refreshed) == 1 and refreshed[0]
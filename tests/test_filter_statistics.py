@@ -0,0 +1,53 @@
+import asyncio
+import random
+
+from core.config import settings
+from crud.filters import build_facet_statistics_query
+from database.database import db_helper
+from indexes.facet_index import FacetIndex, facet_index
+from indexes.int_columns import IntColumnIndex, int_columns
+from indexes.ordinals import ProductOrdinals, product_ordinals
+from indexes.rebuild import index_rebuilder
+from indexes.statistics import compute_statistics
+from load import load_sample
+
+
+def random_specs(sample, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    lists = list(sample.list_properties.items())
+    ints = list(sample.int_properties.items())
+    for _ in range(count):
+        filters = {
+            property_uid: rng.sample(values, min(len(values), rng.randint(1, 3)))
+            for property_uid, values in rng.sample(lists, rng.randint(0, 3))
+        }
+        ranges = {}
+        for property_uid, (low, high) in rng.sample(ints, rng.randint(0, 2)):
+            start = rng.randint(low, high)
+            ranges[property_uid] = {"from": start, "to": rng.randint(start, high)}
+        if filters or ranges:
+            yield filters, ranges
+
+
+def test_sql_statistics_match_memory_indexes(catalog_database, monkeypatch):
+    monkeypatch.setattr(settings.index, "facet_index", True)
+    monkeypatch.setattr(settings.index, "int_columns", True)
+
+    async def compare() -> None:
+        await index_rebuilder.rebuild()
+        sample = await load_sample()
+        async with db_helper.session_factory() as session:
+            for filters, ranges in random_specs(sample, 40):
+                statement = build_facet_statistics_query(filters, ranges)
+                rows = sorted(map(tuple, await session.execute(statement)), key=str)
+                expected = sorted(compute_statistics(filters, ranges), key=str)
+                assert rows == expected, (filters, ranges)
+
+    try:
+        asyncio.run(compare())
+    finally:
+        asyncio.run(db_helper.dispose())
+        ordinals = ProductOrdinals()
+        product_ordinals.replace(ordinals)
+        facet_index.replace(FacetIndex(ordinals))
+        int_columns.replace(IntColumnIndex(ordinals))
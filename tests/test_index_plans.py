@@ -0,0 +1,28 @@
+import asyncio
+
+from database.database import db_helper
+from index_plans import check_plans, format_table, vacuum_property_tables
+
+
+def test_filters_are_driven_by_covering_indexes(catalog_database):
+    async def run():
+        try:
+            await vacuum_property_tables()
+            # На каталоге из 500 товаров планировщик выбирает Seq Scan, поэтому
+            # проверяется, что форма запросов допускает покрывающие индексы
+            return await check_plans(seed=0, seqscan=False)
+        finally:
+            await db_helper.dispose()
+
+    scenarios = asyncio.run(run())
+    failed = [
+        f"{scenario.scenario}: {'; '.join(scenario.errors)}"
+        for scenario in scenarios
+        if scenario.errors
+    ]
+
+    assert {scenario.scenario.split(" (")[0] for scenario in scenarios} == {
+        "filter_products",
+        "get_filter_statistics",
+    }
+    assert not failed, format_table(scenarios) + "\n" + "\n".join(failed)
@@ -0,0 +1,49 @@
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from indexes.name_search import NgramNameSearch
+from models.product_model import Product
+
+
+def make_search(*names: str) -> NgramNameSearch:
+    search = NgramNameSearch()
+    for name in names:
+        search.add_product(uuid4(), name)
+    return search
+
+
+def compile_condition(search: NgramNameSearch, name: str, dialect) -> str:
+    statement = select(Product.uid).where(search.condition(name))
+    return str(statement.compile(dialect=dialect))
+
+
+def test_ngram_condition_uses_in_outside_postgresql():
+    search = make_search("Красный стул", "Синий стул", "Стол")
+
+    compiled = compile_condition(search, "стул", sqlite.dialect())
+
+    assert "products.uid IN (__[POSTCOMPILE_" in compiled
+    assert "ANY" not in compiled
+
+
+def test_ngram_condition_uses_uuid_array_in_postgresql():
+    search = make_search("Красный стул", "Синий стул", "Стол")
+
+    compiled = compile_condition(search, "стул", postgresql.dialect())
+
+    assert "products.uid = ANY (%(param_1)s::UUID[])" in compiled
+
+
+def test_ngram_condition_cache_key_ignores_values():
+    search = make_search("Красный стул", "Синий стул", "Стол", "Стул")
+
+    first = select(Product.uid).where(search.condition("стул"))
+    second = select(Product.uid).where(search.condition("крас"))
+
+    first_key, second_key = first._generate_cache_key(), second._generate_cache_key()
+    assert first_key == second_key
+    assert [b.value for b in first_key.bindparams] != [
+        b.value for b in second_key.bindparams
+    ]
@@ -0,0 +1,96 @@
+import random
+from uuid import uuid4
+
+import pytest
+
+import indexes.bitmaps
+import indexes.facet_index
+import indexes.ordinals
+from indexes.bitmaps import IntBitmaps, RoaringBitmaps
+from indexes.facet_index import FacetIndex
+from indexes.ordinals import ProductOrdinals
+
+BACKENDS = [IntBitmaps]
+if indexes.bitmaps.FrozenBitMap is not None:
+    BACKENDS.append(RoaringBitmaps)
+
+
+@pytest.fixture(params=BACKENDS, ids=lambda backend: backend.name)
+def bitmaps(request, monkeypatch):
+    backend = request.param()
+    for module in (indexes.ordinals, indexes.facet_index):
+        monkeypatch.setattr(module, "bitmaps", backend)
+    return backend
+
+
+def make_ordinals(count: int, seed: int = 0) -> ProductOrdinals:
+    rng = random.Random(seed)
+    ordinals = ProductOrdinals()
+    # Имена с повторами и не-ASCII символами: порядок как в COLLATE "C"
+    ordinals.load(
+        (uuid4(), rng.choice("abcXYZяё") * rng.randint(1, 3)) for _ in range(count)
+    )
+    return ordinals
+
+
+def expected_page(ordinals, selected, sort, page, page_size, after=None):
+    keys = sorted(ordinals._key(o, sort) for o in selected)
+    if after is not None:
+        keys = [key for key in keys if key > after]
+        return [key[-1] for key in keys[:page_size]], len(selected)
+    skip = (page - 1) * page_size
+    return [key[-1] for key in keys[skip : skip + page_size]], len(selected)
+
+
+@pytest.mark.parametrize("density", [1.0, 0.5, 0.05, 0.002])
+@pytest.mark.parametrize("sort", ["name", "uid"])
+def test_page_matches_sorted_selection(bitmaps, density, sort):
+    ordinals = make_ordinals(2000)
+    rng = random.Random(1)
+    selected = [o for o in range(2000) if rng.random() < density]
+    bitmap = bitmaps.from_ordinals(selected, 2000)
+
+    for page in (1, 2, 7):
+        assert ordinals.page(bitmap, sort, page, 20) == expected_page(
+            ordinals, selected, sort, page, 20
+        )
+
+    uids, _ = ordinals.page(bitmap, sort, 1, 20)
+    if uids:
+        last = ordinals.positions[uids[-1]]
+        after = ordinals._key(last, sort)
+        assert ordinals.page(bitmap, sort, 1, 20, after) == expected_page(
+            ordinals, selected, sort, 1, 20, after
+        )
+
+
+def test_page_follows_writes(bitmaps):
+    ordinals = make_ordinals(100)
+    # Порядок для сортировки уже построен: новые товары вставляются в него
+    ordinals.page(ordinals.alive, "name", 1, 10)
+
+    removed = ordinals.uids[0]
+    ordinals.remove(removed)
+    added = [ordinals.add(uuid4(), name) for name in ("", "b", "я")]
+
+    alive = [o for o in range(len(ordinals)) if o != 0]
+    assert ordinals.page(ordinals.alive, "name", 1, 200) == expected_page(
+        ordinals, alive, "name", 1, 200
+    )
+    uids, total = ordinals.page(ordinals.alive, "name", 1, 1)
+    assert uids == [ordinals.uids[added[0]]]
+    assert total == 102
+
+
+def test_remove_property_evicts_bitmaps(bitmaps):
+    ordinals = ProductOrdinals()
+    ordinals.load([])
+    index = FacetIndex(ordinals)
+    index.ready = True
+    kept, removed, value = uuid4(), uuid4(), uuid4()
+    index.add_product(uuid4(), "a", [(kept, value), (removed, value)])
+
+    index.remove_property(removed)
+
+    assert list(index.bitmaps) == [(kept, value)]
+    assert bitmaps.count(index.match({removed: [value]})) == 0
@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+from sqlalchemy import select
+
+from core.config import settings
+from database.database import db_helper
+from database.query_budget import count_queries
+from main import app
+from models.product_model import ProductPropertyValue
+from query_budgets import check_budgets, format_table
+
+
+def test_routes_stay_within_query_budgets(catalog_database, monkeypatch):
+    # check_budgets отключает кэш ответов каталога
+    monkeypatch.setattr(settings.cache, "catalog_enabled", False)
+
+    async def run():
+        try:
+            async with app.router.lifespan_context(app):
+                return await check_budgets(small=2, large=20)
+        finally:
+            await db_helper.dispose()
+
+    measurements = asyncio.run(run())
+    failed = [f"{item.scenario}: {item.error}" for item in measurements if item.error]
+
+    assert not failed, format_table(measurements, 2, 20) + "\n" + "\n".join(failed)
+    budgets = {item.scenario: item.budget for item in measurements}
+    assert budgets["GET /catalog/"] == 3
+    assert budgets["GET /product/{uid}"] == 2
+
+
+def test_product_etag_is_checked_before_list_properties(catalog_database):
+    async def requests():
+        try:
+            async with db_helper.session_factory() as session:
+                uid = await session.scalar(
+                    select(ProductPropertyValue.product_uid).limit(1)
+                )
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                with count_queries() as full:
+                    first = await client.get(f"/product/{uid}")
+                with count_queries() as conditional:
+                    second = await client.get(
+                        f"/product/{uid}",
+                        headers={"If-None-Match": first.headers["ETag"]},
+                    )
+            return first, second, full.count, conditional.count
+        finally:
+            await db_helper.dispose()
+
+    first, second, full, conditional = asyncio.run(requests())
+
+    assert first.status_code == 200
+    assert first.json()["properties"]
+    assert full == 2
+    assert second.status_code == 304
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert conditional == 1
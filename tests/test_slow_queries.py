@@ -0,0 +1,41 @@
+from database.slow_queries import SlowQueryLog, redact_literals
+
+
+def record(log: SlowQueryLog) -> dict:
+    log.record(
+        None,
+        "primary",
+        "SELECT products.uid FROM products WHERE products.name = $1",
+        ("Иванов Иван",),
+        1.0,
+        False,
+    )
+    return log.snapshot()["entries"][-1]
+
+
+def test_parameters_are_redacted_by_default():
+    entry = record(SlowQueryLog(explain_sample_rate=0))
+
+    assert "parameters" not in entry
+    assert entry["parameters_count"] == 1
+    assert "Иванов" not in str(entry)
+
+
+def test_parameters_are_logged_when_enabled():
+    entry = record(SlowQueryLog(explain_sample_rate=0, log_parameters=True))
+
+    assert entry["parameters"] == ["'Иванов Иван'"]
+
+
+def test_plan_literals_are_redacted():
+    plan = (
+        "Index Scan using pk_products on products\n"
+        "  Index Cond: (uid = ANY ('{6f1c...,a3b2...}'::uuid[]))\n"
+        "  Filter: ((name)::text = 'O''Brien'::text)"
+    )
+
+    assert redact_literals(plan) == (
+        "Index Scan using pk_products on products\n"
+        "  Index Cond: (uid = ANY ('?'::uuid[]))\n"
+        "  Filter: ((name)::text = '?'::text)"
+    )